@@ -5,23 +5,120 @@ Streamlit UI for OIC-LogLens — AI-Powered Error Resolution Engine
 """
 
 import streamlit as st
-import requests
+import httpx
 import json
 from datetime import datetime
 
 # API Configuration
 API_BASE_URL = "http://localhost:8000"
+HEALTH_TTL_SECONDS = 10
+UPLOAD_CHUNK_BYTES = 64 * 1024
+API_TIMEOUT        = httpx.Timeout(60.0, connect=2.0)
+
+# HTML fragments — static templates, filled with str.format
+_SUCCESS_HTML       = '<div class="success-box">✅ <b>{}</b> {}</div>'
+_INFO_HTML          = '<div class="info-box">{} <b>{}</b> {}</div>'
+_ERROR_HTML         = '<div class="error-box">{} <b>{}</b><br>{}</div>'
+_JOB_NOT_FOUND_HTML = '<div class="error-box">❌ Job not found. It may have expired.</div>'
+_JOB_SUMMARY        = '{successful} ingested, {duplicates} duplicates, {failed} failed.'
+
+
+@st.cache_resource
+def get_http() -> httpx.Client:
+    """
+    Shared HTTP client for all API calls.
+    Cached across reruns/sessions so the keep-alive connection pool to the API
+    survives Streamlit's top-to-bottom rerun model.
+    """
+    return httpx.Client(
+        base_url=API_BASE_URL,
+        timeout=API_TIMEOUT,
+        transport=httpx.HTTPTransport(
+            retries=2,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+        )
+    )
 
-# Page Configuration
-st.set_page_config(
-    page_title="OIC-LogLens",
-    page_icon="🔍",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
 
-# Custom CSS
-st.markdown("""
+@st.cache_data(ttl=HEALTH_TTL_SECONDS, show_spinner=False)
+def _api_health() -> str:
+    """
+    Probes GET /health. Cached for 10s so reruns don't re-ping the API.
+
+    Returns:
+        "ok" | "err" | "off"
+    """
+    try:
+        response = get_http().get("/health", timeout=2)
+        return "ok" if response.status_code == 200 else "err"
+    except Exception:
+        return "off"
+
+
+def _do_ingest(endpoint: str, success_message: str, **request_kwargs) -> None:
+    """
+    POSTs to an ingest endpoint and renders the success / duplicate / error result.
+
+    Args:
+        endpoint:        API path, e.g. "/ingest/raw".
+        success_message: Text shown in the success box.
+        request_kwargs:  Passed through to httpx (json=..., content=..., headers=...).
+    """
+    try:
+        response = get_http().post(endpoint, **request_kwargs)
+
+        if response.status_code == 200:
+            data = response.json()
+            st.markdown(_SUCCESS_HTML.format("Success!", success_message), unsafe_allow_html=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Log ID", data["log_id"])
+            with col2:
+                st.metric("Jira ID", data["jira_id"].split("/")[-1])
+
+            st.markdown(f"**Full Jira URL:** [{data['jira_id']}]({data['jira_id']})")
+
+        elif response.status_code == 409:
+            st.markdown(_ERROR_HTML.format("⚠️", "Duplicate Detected!", response.json()["detail"]), unsafe_allow_html=True)
+
+        else:
+            st.markdown(_ERROR_HTML.format("❌", "Error!", response.json()["detail"]), unsafe_allow_html=True)
+
+    except Exception as e:
+        st.markdown(_ERROR_HTML.format("❌", "Request Failed!", e), unsafe_allow_html=True)
+
+
+_RESULT_ICONS = {"success": "✅", "duplicate": "⚠️"}
+
+
+def _results_table(results: list[dict]) -> str:
+    """
+    Renders batch job results as one markdown table.
+
+    Args:
+        results: Job results from GET /ingest/status/{job_id}.
+
+    Returns:
+        Markdown table string.
+    """
+    rows = ["| # | Status | Message | Log ID | Jira |", "|---|---|---|---|---|"]
+    for result in results:
+        jira = result.get("jira_id") or ""
+        rows.append("| {} | {} | {} | {} | {} |".format(
+            result["log_index"],
+            _RESULT_ICONS.get(result["status"], "❌"),
+            str(result["message"]).replace("|", "\\|").replace("\n", " "),
+            f"`{result['log_id']}`" if result.get("log_id") else "",
+            f"[{jira.split('/')[-1]}]({jira})" if jira else ""
+        ))
+    return "\n".join(rows)
+
+
+@st.cache_resource
+def _css() -> str:
+    """Static page CSS — built once and shared across sessions and reruns."""
+    return """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -62,7 +159,22 @@ st.markdown("""
         border: 1px solid #DEE2E6;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+# Page Configuration
+st.set_page_config(
+    page_title="OIC-LogLens",
+    page_icon="🔍",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS
+st.markdown(_css(), unsafe_allow_html=True)
+
+# Session defaults — widgets below are keyed into st.session_state
+st.session_state.setdefault("nav_page", "📥 Ingest Logs")
 
 # Header
 st.markdown('<div class="main-header">🔍 OIC-LogLens</div>', unsafe_allow_html=True)
@@ -73,23 +185,24 @@ with st.sidebar:
     st.image("https://via.placeholder.com/200x80/1F4E79/FFFFFF?text=OIC-LogLens", width="stretch")
     st.markdown("---")
     
-    page = st.radio(
+    st.radio(
         "Navigation",
         ["📥 Ingest Logs", "🔍 Search Duplicates", "📊 Dashboard"],
-        label_visibility="collapsed"
+        label_visibility="collapsed",
+        key="nav_page"
     )
+    page = st.session_state.nav_page
     
     st.markdown("---")
     st.markdown("### ⚙️ API Status")
     
-    # Check API health
-    try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=2)
-        if response.status_code == 200:
-            st.success("✅ API Online")
-        else:
-            st.error("❌ API Error")
-    except:
+    # Check API health (_api_health is cached for HEALTH_TTL_SECONDS)
+    api_status = _api_health()
+    if api_status == "ok":
+        st.success("✅ API Online")
+    elif api_status == "err":
+        st.error("❌ API Error")
+    else:
         st.error("❌ API Offline")
     
     st.markdown("---")
@@ -123,43 +236,20 @@ if page == "📥 Ingest Logs":
         if uploaded_file is not None:
             # Preview the file
             with st.expander("📄 Preview File Content"):
-                file_content = uploaded_file.read().decode("utf-8")
-                st.code(file_content[:500] + ("..." if len(file_content) > 500 else ""), language="json")
+                head = uploaded_file.read(500).decode("utf-8", errors="ignore")
+                st.code(head + ("..." if uploaded_file.size > 500 else ""), language="json")
                 uploaded_file.seek(0)  # Reset file pointer
             
             if st.button("🚀 Ingest Uploaded File", type="primary", key="ingest_upload"):
                 with st.spinner("Ingesting log..."):
-                    try:
-                        # Read file content
-                        log_content = uploaded_file.read().decode("utf-8")
-                        
-                        # Use /ingest/raw endpoint
-                        response = requests.post(
-                            f"{API_BASE_URL}/ingest/raw",
-                            json={"log_content": log_content},
-                            timeout=60
-                        )
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            st.markdown(f'<div class="success-box">✅ <b>Success!</b> Log ingested successfully.</div>', unsafe_allow_html=True)
-                            
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.metric("Log ID", data["log_id"])
-                            with col2:
-                                st.metric("Jira ID", data["jira_id"].split("/")[-1])
-                            
-                            st.markdown(f"**Full Jira URL:** [{data['jira_id']}]({data['jira_id']})")
-                        
-                        elif response.status_code == 409:
-                            st.markdown(f'<div class="error-box">⚠️ <b>Duplicate Detected!</b><br>{response.json()["detail"]}</div>', unsafe_allow_html=True)
-                        
-                        else:
-                            st.markdown(f'<div class="error-box">❌ <b>Error!</b><br>{response.json()["detail"]}</div>', unsafe_allow_html=True)
-                    
-                    except Exception as e:
-                        st.markdown(f'<div class="error-box">❌ <b>Request Failed!</b><br>{str(e)}</div>', unsafe_allow_html=True)
+                    # Stream the file body to /ingest/upload — no decode/re-encode copy
+                    uploaded_file.seek(0)
+                    _do_ingest(
+                        "/ingest/upload",
+                        "Log ingested successfully.",
+                        content=iter(lambda: uploaded_file.read(UPLOAD_CHUNK_BYTES), b""),
+                        headers={"Content-Type": "application/octet-stream"}
+                    )
         else:
             st.info("👆 Please upload a JSON log file to begin.")
     
@@ -168,104 +258,64 @@ if page == "📥 Ingest Logs":
         st.subheader("Ingest from URL")
         st.markdown("Fetch a log file from a public HTTP/HTTPS URL.")
         
-        url = st.text_input(
-            "URL",
-            value="https://storage.googleapis.com/promptlyai-public-bucket/oci_logs/01_flow-log.json",
-            help="Direct link to a JSON log file"
-        )
+        # Form — edits don't rerun the script until the user submits
+        with st.form("form_url"):
+            url = st.text_input(
+                "URL",
+                value="https://storage.googleapis.com/promptlyai-public-bucket/oci_logs/01_flow-log.json",
+                help="Direct link to a JSON log file",
+                key="ingest_url"
+            )
+            submitted = st.form_submit_button("🚀 Ingest from URL", type="primary")
         
-        if st.button("🚀 Ingest from URL", type="primary", key="ingest_url"):
+        if submitted:
             with st.spinner("Fetching and ingesting log..."):
-                try:
-                    response = requests.post(
-                        f"{API_BASE_URL}/ingest/url",
-                        json={"url": url},
-                        timeout=60
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        st.markdown(f'<div class="success-box">✅ <b>Success!</b> Log ingested from URL.</div>', unsafe_allow_html=True)
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.metric("Log ID", data["log_id"])
-                        with col2:
-                            st.metric("Jira ID", data["jira_id"].split("/")[-1])
-                        
-                        st.markdown(f"**Full Jira URL:** [{data['jira_id']}]({data['jira_id']})")
-                    
-                    elif response.status_code == 409:
-                        st.markdown(f'<div class="error-box">⚠️ <b>Duplicate Detected!</b><br>{response.json()["detail"]}</div>', unsafe_allow_html=True)
-                    
-                    else:
-                        st.markdown(f'<div class="error-box">❌ <b>Error!</b><br>{response.json()["detail"]}</div>', unsafe_allow_html=True)
-                
-                except Exception as e:
-                    st.markdown(f'<div class="error-box">❌ <b>Request Failed!</b><br>{str(e)}</div>', unsafe_allow_html=True)
+                _do_ingest("/ingest/url", "Log ingested from URL.", json={"url": url})
     
     # ── Tab 3: Raw Text ──
     with tab3:
         st.subheader("Ingest from Raw JSON")
         st.markdown("Paste the log content directly as JSON.")
         
-        log_content = st.text_area(
-            "Log Content (JSON Array)",
-            value='[{"flowId": "test", "errorMessage": "sample error"}]',
-            height=300,
-            help="Paste the raw JSON log content"
-        )
+        with st.form("form_raw"):
+            log_content = st.text_area(
+                "Log Content (JSON Array)",
+                value='[{"flowId": "test", "errorMessage": "sample error"}]',
+                height=300,
+                help="Paste the raw JSON log content",
+                key="ingest_raw_content"
+            )
+            submitted = st.form_submit_button("🚀 Ingest from Raw Text", type="primary")
         
-        if st.button("🚀 Ingest from Raw Text", type="primary", key="ingest_raw"):
+        if submitted:
             with st.spinner("Ingesting log..."):
-                try:
-                    response = requests.post(
-                        f"{API_BASE_URL}/ingest/raw",
-                        json={"log_content": log_content},
-                        timeout=60
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        st.markdown(f'<div class="success-box">✅ <b>Success!</b> Log ingested from raw text.</div>', unsafe_allow_html=True)
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.metric("Log ID", data["log_id"])
-                        with col2:
-                            st.metric("Jira ID", data["jira_id"].split("/")[-1])
-                        
-                        st.markdown(f"**Full Jira URL:** [{data['jira_id']}]({data['jira_id']})")
-                    
-                    elif response.status_code == 409:
-                        st.markdown(f'<div class="error-box">⚠️ <b>Duplicate Detected!</b><br>{response.json()["detail"]}</div>', unsafe_allow_html=True)
-                    
-                    else:
-                        st.markdown(f'<div class="error-box">❌ <b>Error!</b><br>{response.json()["detail"]}</div>', unsafe_allow_html=True)
-                
-                except Exception as e:
-                    st.markdown(f'<div class="error-box">❌ <b>Request Failed!</b><br>{str(e)}</div>', unsafe_allow_html=True)
+                _do_ingest("/ingest/raw", "Log ingested from raw text.", json={"log_content": log_content})
     
     # ── Tab 4: Database ──
     with tab4:
         st.subheader("Ingest from Database")
         st.markdown("Query logs from Oracle or other database. Runs in the background — no timeout.")
 
-        col1, col2 = st.columns(2)
+        with st.form("form_db"):
+            col1, col2 = st.columns(2)
 
-        with col1:
-            connection_string = st.text_input(
-                "Connection String",
-                value="EA_APP/jnjnuh@localhost/FREEPDB1",
-                help="Database connection string"
-            )
+            with col1:
+                connection_string = st.text_input(
+                    "Connection String",
+                    value="EA_APP/jnjnuh@localhost/FREEPDB1",
+                    help="Database connection string",
+                    key="ingest_db_connection"
+                )
 
-        with col2:
-            query = st.text_input(
-                "SQL Query",
-                value="SELECT LOG_JSON FROM TEST_LOGS ORDER BY LOG_ID",
-                help="SQL query to fetch logs (can return multiple rows)"
-            )
+            with col2:
+                query = st.text_input(
+                    "SQL Query",
+                    value="SELECT LOG_JSON FROM TEST_LOGS ORDER BY LOG_ID",
+                    help="SQL query to fetch logs (can return multiple rows)",
+                    key="ingest_db_query"
+                )
+
+            submit = st.form_submit_button("🚀 Ingest from Database", type="primary")
 
         # ── Session state for tracking background job ──
         if "db_job_id" not in st.session_state:
@@ -273,42 +323,39 @@ if page == "📥 Ingest Logs":
         if "db_job_done" not in st.session_state:
             st.session_state.db_job_done = False
 
-        col_btn1, col_btn2 = st.columns([1, 4])
-
-        with col_btn1:
-            submit = st.button("🚀 Ingest from Database", type="primary", key="ingest_db")
-
-        with col_btn2:
-            if st.session_state.db_job_id and not st.session_state.db_job_done:
-                st.button("🔄 Refresh Status", key="refresh_db")
+        # Refresh lives outside the form so polling doesn't resubmit the job
+        if st.session_state.db_job_id and not st.session_state.db_job_done and not submit:
+            st.button("🔄 Refresh Status", key="refresh_db")
 
         # ── Submit job ──
         if submit:
             st.session_state.db_job_id = None
             st.session_state.db_job_done = False
             try:
-                response = requests.post(
-                    f"{API_BASE_URL}/ingest/database",
+                response = get_http().post(
+                    "/ingest/database",
                     json={"connection_string": connection_string, "query": query},
-                    timeout=30
+                    timeout=httpx.Timeout(30.0, connect=2.0)
                 )
 
                 if response.status_code == 200:
                     data = response.json()
                     st.session_state.db_job_id = data["job_id"]
                     st.markdown(
-                        f'<div class="info-box">⏳ <b>Job Accepted!</b> ' +
-                        f'{data["total_logs"]} logs queued. Job ID: <code>{data["job_id"]}</code></div>',
+                        _INFO_HTML.format(
+                            "⏳", "Job Accepted!",
+                            f'Query queued. Job ID: <code>{data["job_id"]}</code>'
+                        ),
                         unsafe_allow_html=True
                     )
                 else:
                     st.markdown(
-                        f'<div class="error-box">❌ <b>Error submitting job!</b><br>{response.text}</div>',
+                        _ERROR_HTML.format("❌", "Error submitting job!", response.text),
                         unsafe_allow_html=True
                     )
             except Exception as e:
                 st.markdown(
-                    f'<div class="error-box">❌ <b>Request Failed!</b><br>{str(e)}</div>',
+                    _ERROR_HTML.format("❌", "Request Failed!", e),
                     unsafe_allow_html=True
                 )
 
@@ -316,9 +363,9 @@ if page == "📥 Ingest Logs":
         if st.session_state.db_job_id:
             job_id = st.session_state.db_job_id
             try:
-                status_resp = requests.get(
-                    f"{API_BASE_URL}/ingest/status/{job_id}",
-                    timeout=10
+                status_resp = get_http().get(
+                    f"/ingest/status/{job_id}",
+                    timeout=httpx.Timeout(10.0, connect=2.0)
                 )
 
                 if status_resp.status_code == 200:
@@ -328,13 +375,14 @@ if page == "📥 Ingest Logs":
                     status = job["status"]
 
                     # ── Progress bar ──
-                    progress = processed / total if total > 0 else 0
-                    st.progress(progress, text=f"Processing {processed}/{total} logs...")
+                    # total_logs is null until the job has read the whole source query
+                    progress = processed / total if total else 0
+                    st.progress(progress, text=f"Processing {processed}/{total or '?'} logs...")
 
                     # ── Status metrics ──
                     col1, col2, col3, col4 = st.columns(4)
                     with col1:
-                        st.metric("Total", total)
+                        st.metric("Total", total if total is not None else "…")
                     with col2:
                         st.metric("✅ Successful", job["successful"])
                     with col3:
@@ -347,52 +395,41 @@ if page == "📥 Ingest Logs":
                         st.info("⏳ Job is pending — will start shortly...")
                     elif status == "in_progress":
                         current = job.get("current_log")
-                        st.info(f"⚙️ Processing log {current}/{total}... Click **Refresh Status** to update.")
+                        st.info(f"⚙️ Processing log {current}/{total or '?'}... Click **Refresh Status** to update.")
                     elif status == "completed":
                         st.session_state.db_job_done = True
                         if job["failed"] == 0:
                             st.markdown(
-                                f'<div class="success-box">✅ <b>Completed!</b> ' +
-                                f'{job["successful"]} ingested, {job["duplicates"]} duplicates, {job["failed"]} failed.</div>',
+                                _SUCCESS_HTML.format("Completed!", _JOB_SUMMARY.format(**job)),
                                 unsafe_allow_html=True
                             )
                         else:
                             st.markdown(
-                                f'<div class="info-box">⚠️ <b>Completed with errors.</b> ' +
-                                f'{job["successful"]} ingested, {job["duplicates"]} duplicates, {job["failed"]} failed.</div>',
+                                _INFO_HTML.format("⚠️", "Completed with errors.", _JOB_SUMMARY.format(**job)),
                                 unsafe_allow_html=True
                             )
                     elif status == "failed":
                         st.session_state.db_job_done = True
                         st.markdown(
-                            f'<div class="error-box">❌ <b>Job failed!</b><br>{job.get("error", "Unknown error")}</div>',
+                            _ERROR_HTML.format("❌", "Job failed!", job.get("error", "Unknown error")),
                             unsafe_allow_html=True
                         )
 
                     # ── Individual results ──
                     if job.get("results"):
                         with st.expander(f"📋 View Results ({len(job['results'])} so far)", expanded=False):
-                            for result in job["results"]:
-                                i = result["log_index"]
-                                if result["status"] == "success":
-                                    st.success(f"**Log {i}:** {result['message']}")
-                                    st.markdown(f"  - Log ID: `{result['log_id']}`")
-                                    jira = result['jira_id']
-                                    st.markdown(f"  - Jira: [{jira.split('/')[-1]}]({jira})")
-                                elif result["status"] == "duplicate":
-                                    st.warning(f"**Log {i}:** {result['message']}")
-                                else:
-                                    st.error(f"**Log {i}:** {result['message']}")
+                            # One markdown table for all rows — a single element regardless of batch size
+                            st.markdown(_results_table(job["results"]))
 
                 elif status_resp.status_code == 404:
                     st.markdown(
-                        f'<div class="error-box">❌ Job not found. It may have expired.</div>',
+                        _JOB_NOT_FOUND_HTML,
                         unsafe_allow_html=True
                     )
 
             except Exception as e:
                 st.markdown(
-                    f'<div class="error-box">❌ <b>Failed to fetch job status!</b><br>{str(e)}</div>',
+                    _ERROR_HTML.format("❌", "Failed to fetch job status!", e),
                     unsafe_allow_html=True
                 )
 
@@ -455,16 +492,15 @@ elif page == "🔍 Search Duplicates":
     if st.button("🔍 Search Similar Logs", type="primary") and log_content:
         with st.spinner("Searching for similar logs..."):
             try:
-                response = requests.post(
-                    f"{API_BASE_URL}/search",
-                    json={"log_content": log_content},
-                    timeout=60
+                response = get_http().post(
+                    "/search",
+                    json={"log_content": log_content}
                 )
                 
                 if response.status_code == 200:
                     data = response.json()
                     
-                    st.markdown(f'<div class="success-box">✅ <b>{data["message"]}</b></div>', unsafe_allow_html=True)
+                    st.markdown(_SUCCESS_HTML.format(data["message"], ""), unsafe_allow_html=True)
                     
                     if data["matches"]:
                         st.markdown("### 📊 Search Results")
@@ -520,10 +556,10 @@ elif page == "🔍 Search Duplicates":
                         st.info("No similar logs found.")
                 
                 else:
-                    st.markdown(f'<div class="error-box">❌ <b>Error!</b><br>{response.json()["detail"]}</div>', unsafe_allow_html=True)
+                    st.markdown(_ERROR_HTML.format("❌", "Error!", response.json()["detail"]), unsafe_allow_html=True)
             
             except Exception as e:
-                st.markdown(f'<div class="error-box">❌ <b>Request Failed!</b><br>{str(e)}</div>', unsafe_allow_html=True)
+                st.markdown(_ERROR_HTML.format("❌", "Request Failed!", e), unsafe_allow_html=True)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,36 @@
+"""
+cache.py
+--------
+Cache statistics and maintenance for OIC-LogLens.
+Aggregates the per-module caches so the API can report and clear them
+in one place (GET /stats/cache, POST /admin/clear-cache).
+"""
+
+from normalizer import get_template_cache_stats, clear_template_cache
+from embedder import get_embedding_cache_stats, clear_embedding_cache
+from search_service import get_query_cache_stats, clear_query_cache
+from config import logger
+
+
+def get_cache_stats() -> dict:
+    """
+    Returns statistics for every performance cache.
+
+    Returns:
+        Dict keyed by cache name → stats dict.
+    """
+    return {
+        "normalized_logs": get_template_cache_stats(),
+        "embeddings":      get_embedding_cache_stats(),
+        "search_results":  get_query_cache_stats(),
+    }
+
+
+def clear_all_caches() -> None:
+    """
+    Empties every performance cache.
+    """
+    clear_template_cache()
+    clear_embedding_cache()
+    clear_query_cache()
+    logger.info("All caches cleared.")
@@ -5,8 +5,11 @@ Shared configuration for OIC-LogLens.
 Import from here — do not redefine in individual modules.
 """
 
+import os
 import logging
+import httpx
 from google import genai
+from google.genai import types
 
 # ── LOGGING ────────────────────────────────────────────────────────────────────
 
@@ -21,7 +24,48 @@ logger = logging.getLogger("oic_loglens")
 GENERATION_MODEL  = "gemini-2.0-flash"
 EMBEDDING_MODEL = "gemini-embedding-001"
 
+# Requests per minute this worker may send to Gemini — set to the project's quota
+GEMINI_RPM = int(os.getenv("OLL_GEMINI_RPM", 120))
+
+# ── CACHES ─────────────────────────────────────────────────────────────────────
+
+TEMPLATE_CACHE_PATH  = os.getenv("OLL_TEMPLATE_CACHE", "normalize_cache.sqlite3")
+EMBEDDING_CACHE_PATH = os.getenv("OLL_EMBEDDING_CACHE", "embedding_cache.sqlite3")
+
+# ── JOB STORE ──────────────────────────────────────────────────────────────────
+# Background ingest jobs live in Redis when OLL_REDIS_URL is set, so every
+# uvicorn worker sees every job; otherwise they are kept in process memory.
+
+REDIS_URL       = os.getenv("OLL_REDIS_URL")
+JOB_TTL_SECONDS = int(os.getenv("OLL_JOB_TTL_SECONDS", 24 * 3600))
+
 
 # ── CLIENT ─────────────────────────────────────────────────────────────────────
+# One pooled HTTP client per process so TCP/TLS handshakes are amortized
+# across every Gemini call. Import `client` / `async_client` from here —
+# never construct another genai.Client in a module.
+
+HTTP_POOL_LIMITS = httpx.Limits(
+    max_connections=32,
+    max_keepalive_connections=16,
+    keepalive_expiry=60
+)
+HTTP_TIMEOUT_SECONDS = 30.0
+
+_http_client = httpx.Client(
+    transport=httpx.HTTPTransport(limits=HTTP_POOL_LIMITS),
+    timeout=HTTP_TIMEOUT_SECONDS
+)
+_http_async_client = httpx.AsyncClient(
+    transport=httpx.AsyncHTTPTransport(limits=HTTP_POOL_LIMITS),
+    timeout=HTTP_TIMEOUT_SECONDS
+)
+
+client = genai.Client(
+    http_options=types.HttpOptions(
+        httpx_client=_http_client,
+        httpx_async_client=_http_async_client
+    )
+)
 
-client = genai.Client()
\ No newline at end of file
+async_client = client.aio
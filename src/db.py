@@ -6,13 +6,20 @@ Handles all interactions with Oracle 26ai — inserts normalized logs,
 raw logs, embeddings, and Jira IDs into the OIC_KB_ISSUE table.
 """
 
-import json
+import os
+import math
+import zlib
 import uuid
 import array
+import orjson
 import hashlib
+import threading
 import oracledb
+import numpy as np
 from datetime import datetime
+from collections import OrderedDict
 from config import logger
+from embedder import quantize_embedding_i8
 
 # ── CONNECTION CONFIG ──────────────────────────────────────────────────────────
 
@@ -20,6 +27,19 @@ DB_USER     = "EA_APP"
 DB_PASSWORD = "jnjnuh"
 DB_DSN      = "localhost/FREEPDB1"
 
+# ── ERRORS ─────────────────────────────────────────────────────────────────────
+
+ORA_UNIQUE_VIOLATION = 1   # ORA-00001 — OIC_KB_ISSUE_HASH_UQ on LOG_HASH
+
+
+class DuplicateLogError(Exception):
+    """Raised when a log with the same LOG_HASH is already in OIC_KB_ISSUE."""
+
+    def __init__(self, log_hash: str):
+        super().__init__(f"Duplicate log (hash: {log_hash[:16]}...)")
+        self.log_hash = log_hash
+
+
 # ── SQL ────────────────────────────────────────────────────────────────────────
 
 INSERT_LOG_SQL = """
@@ -56,10 +76,6 @@ INSERT INTO OIC_KB_ISSUE (
 )
 """
 
-CHECK_DUPLICATE_SQL = """
-SELECT COUNT(*) FROM OIC_KB_ISSUE WHERE LOG_HASH = :log_hash
-"""
-
 SEARCH_SIMILAR_SQL = """
 SELECT
     LOG_ID,
@@ -73,24 +89,250 @@ SELECT
 FROM
     OIC_KB_ISSUE
 ORDER BY
-    VECTOR_DISTANCE(VECTOR, :query_vector, COSINE)
-FETCH FIRST :top_n ROWS ONLY
+    SIMILARITY_SCORE
+FETCH APPROX FIRST :top_n ROWS ONLY
 """
 
+HASH_EXISTS_SQL = """
+SELECT 1 FROM OIC_KB_ISSUE WHERE LOG_HASH = :log_hash
+"""
+
+ALL_HASHES_SQL = """
+SELECT LOG_HASH FROM OIC_KB_ISSUE
+"""
+
+HASH_SCAN_ARRAYSIZE = 10_000   # rows per fetch round-trip when seeding the hash filter
+
+# Declared bind types — Oracle skips the per-execute type describe.
+INSERT_LOG_INPUT_SIZES = {
+    "log_id":          36,                           # uuid4 string
+    "log_hash":        oracledb.DB_TYPE_RAW,         # 32-byte sha256 digest
+    "event_time":      oracledb.DB_TYPE_TIMESTAMP,   # may be None in a batch's first row
+    "semantic_text":   oracledb.DB_TYPE_CLOB,
+    "raw_json":        oracledb.DB_TYPE_BLOB,
+    "normalized_json": oracledb.DB_TYPE_BLOB,
+    "vector":          oracledb.DB_TYPE_VECTOR,
+}
+
+SEARCH_SIMILAR_INPUT_SIZES = {
+    "query_vector": oracledb.DB_TYPE_VECTOR,
+    "top_n":        int,
+}
+
+# RAW_JSON / NORMALIZED_JSON are stored zlib-compressed in BLOB columns —
+# JSON logs deflate to a few percent of their size, cutting redo and wire bytes.
+JSON_COMPRESS_LEVEL = 6
+
+
+# ── KNOWN HASHES ───────────────────────────────────────────────────────────────
+# In-process LRU of LOG_HASHes already in OIC_KB_ISSUE, so re-submitting the
+# same log is rejected before any LLM or DB work. The UNIQUE constraint stays
+# the source of truth across workers — a miss here just means "ask Oracle".
+#
+# Behind the LRU sits a Bloom filter over every stored LOG_HASH (seeded from
+# OIC_KB_ISSUE by load_hash_filter). "Not in filter" means definitely new —
+# no DB call; "maybe" is settled with one indexed LOG_HASH lookup, so older
+# duplicates that fell out of the LRU still skip the LLM calls.
+
+KNOWN_HASHES_SIZE = 4096
+
+HASH_FILTER_CAPACITY = 1_000_000   # expected stored logs
+HASH_FILTER_FP_RATE  = 0.001       # false "maybe" rate at capacity
+
+_known_hashes      = OrderedDict()
+_known_hashes_lock = threading.Lock()
+
+
+class _HashFilter:
+    """
+    Bloom filter over hex SHA256 LOG_HASHes. The hash is already uniformly
+    distributed, so the k bit positions come from double hashing its two
+    leading 64-bit words — no extra hashing per probe.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float):
+        self._bits   = math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)
+        self._hashes = max(1, round(self._bits / capacity * math.log(2)))
+        self._array  = bytearray((self._bits + 7) // 8)
+        self._lock   = threading.Lock()
+
+    def _positions(self, log_hash: str):
+        h1 = int(log_hash[:16], 16)
+        h2 = int(log_hash[16:32], 16) | 1
+        return ((h1 + i * h2) % self._bits for i in range(self._hashes))
+
+    def add(self, log_hash: str) -> None:
+        with self._lock:
+            for pos in self._positions(log_hash):
+                self._array[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, log_hash: str) -> bool:
+        return all(self._array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(log_hash))
+
+
+_hash_filter = _HashFilter(HASH_FILTER_CAPACITY, HASH_FILTER_FP_RATE)
+
+
+def _remember_hash(log_hash: str) -> None:
+    _hash_filter.add(log_hash)
+    with _known_hashes_lock:
+        _known_hashes[log_hash] = True
+        _known_hashes.move_to_end(log_hash)
+        if len(_known_hashes) > KNOWN_HASHES_SIZE:
+            _known_hashes.popitem(last=False)
+
+
+def load_hash_filter() -> None:
+    """
+    Seeds the LOG_HASH Bloom filter from OIC_KB_ISSUE (called on API startup).
+    Non-fatal — if Oracle is unreachable the filter starts empty and
+    duplicates are still caught by the UNIQUE constraint at INSERT time.
+    """
+    try:
+        conn   = get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.arraysize = HASH_SCAN_ARRAYSIZE
+            cursor.execute(ALL_HASHES_SQL)
+            count = 0
+            for (digest,) in cursor:
+                _hash_filter.add(digest.hex())
+                count += 1
+            logger.info(f"LOG_HASH filter seeded with {count} hash(es)")
+
+        finally:
+            cursor.close()
+            conn.close()
+
+    except Exception as e:
+        logger.warning(f"LOG_HASH filter not seeded: {e}")
+
+
+def _hash_exists(log_hash: str) -> bool:
+    conn   = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(HASH_EXISTS_SQL, {"log_hash": bytes.fromhex(log_hash)})
+        return cursor.fetchone() is not None
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def known_duplicate_cached(log_hash: str) -> bool | None:
+    """
+    The in-memory half of is_known_duplicate — never touches the DB, so it
+    is safe to call from the event loop.
+
+    Args:
+        log_hash: SHA256 hash of the raw log
+
+    Returns:
+        True if the hash is known to exist, False if it definitely does not,
+        None if the Bloom filter says "maybe" and only the DB can tell
+    """
+    with _known_hashes_lock:
+        if log_hash in _known_hashes:
+            _known_hashes.move_to_end(log_hash)
+            return True
+
+    return None if log_hash in _hash_filter else False
+
+
+def is_known_duplicate(log_hash: str) -> bool:
+    """
+    Check if the given hash is already stored, without a DB call unless
+    the Bloom filter says "maybe" (see KNOWN HASHES above).
+
+    Args:
+        log_hash: SHA256 hash of the raw log
+
+    Returns:
+        True if the hash is known to exist in OIC_KB_ISSUE, False if unknown
+    """
+    known = known_duplicate_cached(log_hash)
+    if known is not None:
+        return known
+
+    try:
+        exists = _hash_exists(log_hash)
+    except Exception as e:
+        logger.warning(f"LOG_HASH lookup failed, deferring to INSERT: {e}")
+        return False
+
+    if exists:
+        _remember_hash(log_hash)
+    return exists
+
+
+# ── CONNECTION POOL ────────────────────────────────────────────────────────────
+
+POOL_MIN        = 2
+POOL_MAX        = 10
+POOL_INCREMENT  = 1
+POOL_WAIT_MS    = 5000 # max wait for a free connection before acquire() fails
+POOL_PING_SECS  = 60   # ping idle connections older than this before handing out
+STMT_CACHE_SIZE = 50   # per-connection statement cache — covers every db.py + graph_service.py statement
+
+_pool      = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> oracledb.ConnectionPool:
+    """
+    Returns the shared Oracle connection pool, creating it on first use.
+    Used by both db.py and graph_service.py so they share one set of sessions.
+
+    Returns:
+        oracledb.ConnectionPool instance.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                logger.info("Creating Oracle 26ai connection pool ...")
+                _pool = oracledb.create_pool(
+                    user=DB_USER,
+                    password=DB_PASSWORD,
+                    dsn=DB_DSN,
+                    min=POOL_MIN,
+                    max=POOL_MAX,
+                    increment=POOL_INCREMENT,
+                    getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                    wait_timeout=POOL_WAIT_MS,
+                    ping_interval=POOL_PING_SECS,
+                    stmtcachesize=STMT_CACHE_SIZE
+                )
+                logger.info("Connection pool ready.")
+    return _pool
+
+
+def close_connection_pool() -> None:
+    """
+    Closes the shared connection pool (called on API shutdown).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+            logger.info("Connection pool closed.")
+
 
 # ── CONNECTION ─────────────────────────────────────────────────────────────────
 
 def get_connection() -> oracledb.Connection:
     """
-    Creates and returns a new Oracle DB connection.
+    Acquires an Oracle DB connection from the shared pool.
+    Calling close() on it releases it back to the pool.
 
     Returns:
         oracledb.Connection instance.
     """
-    logger.info("Connecting to Oracle 26ai ...")
-    conn = oracledb.connect(user=DB_USER, password=DB_PASSWORD, dsn=DB_DSN)
-    logger.info("Connected.")
-    return conn
+    return get_pool().acquire()
 
 
 # ── HELPERS ────────────────────────────────────────────────────────────────────
@@ -114,25 +356,92 @@ def _parse_event_time(timestamp_str: str | None) -> datetime | None:
         return None
 
 
-def _to_vector_array(embedding: list[float]) -> array.array:
+def new_ids(n: int) -> list[str]:
+    """
+    Generates n random (version 4) UUID strings from a single os.urandom draw.
+
+    Args:
+        n: Number of ids to generate.
+
+    Returns:
+        List of n UUID strings.
+    """
+    buf = os.urandom(16 * n)
+    return [str(uuid.UUID(bytes=buf[i:i + 16], version=4)) for i in range(0, 16 * n, 16)]
+
+
+def _to_vector_array(embedding: np.ndarray | list[float]) -> array.array:
+    """
+    Converts an embedding into an INT8 array for Oracle VECTOR column.
+    The embedding is L2-normalized and quantized (quantize_embedding_i8) —
+    a quarter of the FLOAT32 bytes on the wire and in the HNSW scan, and
+    cosine distance needs no scale, so none is stored.
+
+    Args:
+        embedding: float32 numpy array (or list of floats) from the embedding model.
+
+    Returns:
+        array.array of type int8.
+    """
+    # Copy the int8 buffer straight into the array — no per-element Python ints.
+    quantized, _ = quantize_embedding_i8(embedding)
+    packed = array.array("b")
+    packed.frombytes(quantized)
+    return packed
+
+
+def fetch_lobs_inline(cursor, metadata):
+    """
+    Output type handler — fetches CLOB columns inline as str and BLOB
+    columns as bytes, so rows need no per-cell LOB read() round-trips.
+    """
+    if metadata.type_code in (oracledb.DB_TYPE_CLOB, oracledb.DB_TYPE_LONG):
+        return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+    if metadata.type_code == oracledb.DB_TYPE_BLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG_RAW, arraysize=cursor.arraysize)
+
+
+def _decompress_json(blob: bytes | None):
+    """
+    Inflates a zlib-compressed JSON column (RAW_JSON / NORMALIZED_JSON).
+
+    Args:
+        blob: Compressed column value, or None.
+
+    Returns:
+        Parsed JSON value, or None if the column is empty.
+    """
+    if not blob:
+        return None
+    return orjson.loads(zlib.decompress(blob))
+
+
+def encode_raw_log(raw_log: list) -> tuple[bytes, str]:
     """
-    Converts a list of floats into a FLOAT32 array for Oracle VECTOR column.
+    Serializes the raw log to the canonical bytes stored in RAW_JSON and
+    hashed into LOG_HASH — computed once per log and reused by _build_record.
+
+    Keys are sorted so the same log always hashes the same regardless of
+    the key order it arrived in.
 
     Args:
-        embedding: List of floats from the embedding model.
+        raw_log: Original raw log list (JSON array).
 
     Returns:
-        array.array of type float32.
+        Tuple of (sorted-key compact JSON as UTF-8 bytes, hex SHA256 digest).
     """
-    return array.array("f", embedding)
+    raw_json = orjson.dumps(raw_log, option=orjson.OPT_SORT_KEYS)
+    return raw_json, hashlib.sha256(raw_json).hexdigest()
 
 
 def _build_record(
     normalized_log: dict,
     raw_log: list,
-    embedding: list[float],
+    embedding: np.ndarray,
     semantic_text: str,
-    jira_id: str | None
+    jira_id: str | None,
+    log_id: str | None = None,
+    raw_json: bytes | None = None
 ) -> dict:
     """
     Builds the database record dict from normalized log, raw log, and embedding.
@@ -143,6 +452,8 @@ def _build_record(
         embedding:       Vector embedding (output of generate_embedding).
         semantic_text:   Text used to generate the embedding.
         jira_id:         Associated Jira issue ID (optional).
+        log_id:          Pre-generated LOG_ID (optional — see new_ids).
+        raw_json:        encode_raw_log bytes of raw_log (optional — encoded here if omitted).
 
     Returns:
         Dict of column name → value ready for INSERT into OIC_KB_ISSUE.
@@ -150,12 +461,15 @@ def _build_record(
     flow  = normalized_log.get("flow")  or {}
     error = normalized_log.get("error") or {}
 
-    raw_json_str = json.dumps(raw_log, sort_keys=True)
-    log_hash     = hashlib.sha256(raw_json_str.encode()).hexdigest()
+    # The same sorted bytes are hashed and compressed for storage
+    if raw_json is None:
+        raw_json, log_hash = encode_raw_log(raw_log)
+    else:
+        log_hash = hashlib.sha256(raw_json).hexdigest()
 
     return {
-        "log_id":          str(uuid.uuid4()),
-        "log_hash":        log_hash,
+        "log_id":          log_id or str(uuid.uuid4()),
+        "log_hash":        bytes.fromhex(log_hash),   # RAW(32) — hex only in Python
         "jira_id":         jira_id,
         "log_type":        normalized_log.get("log_type"),
         "event_time":      _parse_event_time(flow.get("timestamp")),
@@ -165,20 +479,57 @@ def _build_record(
         "error_code":      error.get("code"),
         "error_summary":   error.get("summary"),
         "semantic_text":   semantic_text,
-        "raw_json":        json.dumps(raw_log),
-        "normalized_json": json.dumps(normalized_log),
+        "raw_json":        zlib.compress(raw_json, JSON_COMPRESS_LEVEL),
+        "normalized_json": zlib.compress(orjson.dumps(normalized_log), JSON_COMPRESS_LEVEL),
         "vector":          _to_vector_array(embedding),
     }
 
 
 # ── INSERT ─────────────────────────────────────────────────────────────────────
 
+def _insert_records(records: list[dict]) -> dict[int, oracledb._Error]:
+    """
+    Writes built records with one executemany round-trip and one commit.
+    Shared by insert_log (one record) and insert_logs_bulk (many).
+
+    Args:
+        records: Output of _build_record, one per row.
+
+    Returns:
+        Dict of record offset → oracledb error for rows that failed.
+    """
+    conn   = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.setinputsizes(**INSERT_LOG_INPUT_SIZES)
+        cursor.executemany(INSERT_LOG_SQL, records, batcherrors=True)
+        errors = {error.offset: error for error in cursor.getbatcherrors()}
+        conn.commit()
+
+        for i, record in enumerate(records):
+            if i not in errors or errors[i].code == ORA_UNIQUE_VIOLATION:
+                _remember_hash(record["log_hash"].hex())
+
+        return errors
+
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Insert failed: {e}")
+        raise
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
 def insert_log(
     normalized_log: dict,
     raw_log: list,
-    embedding: list[float],
+    embedding: np.ndarray,
     semantic_text: str,
-    jira_id: str | None = None
+    jira_id: str | None = None,
+    raw_json: bytes | None = None
 ) -> str:
     """
     Inserts a log record into OIC_KB_ISSUE.
@@ -189,66 +540,72 @@ def insert_log(
         embedding:       Vector embedding (output of generate_embedding).
         semantic_text:   Text used to generate the embedding.
         jira_id:         Associated Jira issue ID (optional).
+        raw_json:        encode_raw_log bytes of raw_log (optional).
 
     Returns:
         LOG_ID of the inserted record.
+
+    Raises:
+        DuplicateLogError: If the LOG_HASH unique constraint is violated.
     """
-    record = _build_record(normalized_log, raw_log, embedding, semantic_text, jira_id)
+    record = _build_record(normalized_log, raw_log, embedding, semantic_text, jira_id, raw_json=raw_json)
 
     logger.info(f"Inserting log into OIC_KB_ISSUE | flow_code: {record['flow_code']} | jira_id: {jira_id}")
 
-    conn   = get_connection()
-    cursor = conn.cursor()
+    errors = _insert_records([record])
 
-    try:
-        cursor.execute(INSERT_LOG_SQL, record)
-        conn.commit()
-        logger.info(f"Insert successful | LOG_ID: {record['log_id']}")
-        return record["log_id"]
+    if errors:
+        error = errors[0]
+        if error.code == ORA_UNIQUE_VIOLATION:
+            logger.warning(f"Duplicate log detected: {record['log_hash'].hex()}")
+            raise DuplicateLogError(record["log_hash"].hex())
+        logger.error(f"Insert failed: {error.message}")
+        raise oracledb.DatabaseError(error)
 
-    except Exception as e:
-        conn.rollback()
-        logger.error(f"Insert failed: {e}")
-        raise
-
-    finally:
-        cursor.close()
-        conn.close()
+    logger.info(f"Insert successful | LOG_ID: {record['log_id']}")
+    return record["log_id"]
 
 
-# ── DUPLICATE CHECK ────────────────────────────────────────────────────────────
-
-def check_duplicate(log_hash: str) -> bool:
+def insert_logs_bulk(entries: list[dict]) -> tuple[list[str | None], dict[int, oracledb._Error]]:
     """
-    Check if a log with the given hash already exists in OIC_KB_ISSUE.
+    Inserts many log records into OIC_KB_ISSUE with a single executemany
+    round-trip and one commit.
+
+    Rows that fail (e.g. ORA-00001 on LOG_HASH — see ORA_UNIQUE_VIOLATION)
+    are reported back via batch errors instead of aborting the whole batch.
 
     Args:
-        log_hash: SHA256 hash of the raw log
+        entries: List of dicts with the keyword arguments of insert_log
+                 (normalized_log, raw_log, embedding, semantic_text, jira_id, raw_json).
 
     Returns:
-        True if duplicate exists, False otherwise
+        Tuple of (LOG_IDs in input order — None for rows that failed,
+                  dict of input offset → oracledb error for failed rows).
     """
-    conn   = get_connection()
-    cursor = conn.cursor()
+    if not entries:
+        return [], {}
 
-    try:
-        cursor.execute(CHECK_DUPLICATE_SQL, {"log_hash": log_hash})
-        count = cursor.fetchone()[0]
-        return count > 0
+    records = [
+        _build_record(**entry, log_id=log_id)
+        for entry, log_id in zip(entries, new_ids(len(entries)))
+    ]
 
-    except Exception as e:
-        logger.error(f"Duplicate check failed: {e}")
-        raise
+    logger.info(f"Bulk inserting {len(records)} log(s) into OIC_KB_ISSUE")
 
-    finally:
-        cursor.close()
-        conn.close()
+    errors = _insert_records(records)
+
+    for offset, error in errors.items():
+        logger.error(f"Bulk insert row {offset} failed: {error.message}")
+
+    log_ids = [None if i in errors else r["log_id"] for i, r in enumerate(records)]
+    logger.info(f"Bulk insert done | inserted: {len(records) - len(errors)} | failed: {len(errors)}")
+    return log_ids, errors
 
 
 # ── SEARCH ─────────────────────────────────────────────────────────────────────
 
 def search_similar_logs(
-    query_embedding: list[float],
+    query_embedding: np.ndarray,
     top_n: int = 5
 ) -> list[dict]:
     """
@@ -277,33 +634,24 @@ def search_similar_logs(
     cursor = conn.cursor()
 
     try:
+        cursor.outputtypehandler = fetch_lobs_inline
+        cursor.setinputsizes(**SEARCH_SIMILAR_INPUT_SIZES)
         cursor.execute(SEARCH_SIMILAR_SQL, {
             "query_vector": query_vector,
             "top_n":        top_n
         })
 
         columns = [col[0].lower() for col in cursor.description]
-        rows    = cursor.fetchall()
-
-        # Read all LOB/CLOB fields while connection is still open
-        results = []
-        for row in rows:
-            record = {}
-            for col, val in zip(columns, row):
-                if hasattr(val, "read"):
-                    record[col] = val.read()
-                else:
-                    record[col] = val
-
-            # Parse NORMALIZED_JSON into dict if present
-            if "normalized_json" in record and record["normalized_json"]:
+        results = [dict(zip(columns, row)) for row in cursor]
+
+        # Inflate + parse NORMALIZED_JSON into dict if present
+        for record in results:
+            if record.get("normalized_json"):
                 try:
-                    record["normalized_json"] = json.loads(record["normalized_json"])
+                    record["normalized_json"] = _decompress_json(record["normalized_json"])
                 except:
                     record["normalized_json"] = {}
 
-            results.append(record)
-
         logger.info(f"Search complete. {len(results)} results returned.")
         return results
 
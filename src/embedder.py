@@ -4,16 +4,224 @@ embedder.py
 Embedding module for OIC-LogLens.
 Builds a semantic text string from a normalized log and generates
 vector embeddings using Gemini text-embedding-004.
+
+Embeddings are cached by embedding text — errors from the same endpoint
+usually produce identical text — in an in-process LRU backed by a
+persistent SQLite tier, so a hit never reaches the Gemini API.
 """
 
-import logging
-from google import genai
-from prompts import get_embedding_text
-from config import client, logger, EMBEDDING_MODEL
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from prompts import get_embedding_text, get_embedding_texts_batch
+from gemini_rate import call_gemini
+from config import client, async_client, logger, EMBEDDING_MODEL, EMBEDDING_CACHE_PATH
+
+# ── BATCH LIMITS ───────────────────────────────────────────────────────────────
+
+GEMINI_EMBED_BATCH_LIMIT = 100   # max texts per batchEmbedContents request
+
+
+# ── EMBEDDING CACHE ────────────────────────────────────────────────────────────
+
+EMBEDDING_LRU_SIZE = 4096
+
+CREATE_EMBEDDING_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    text_hash  TEXT PRIMARY KEY,
+    text       TEXT NOT NULL,
+    embedding  BLOB NOT NULL
+)
+"""
+
+
+class _EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by blake2b(embedding text):
+    an in-process LRU in front of a SQLite table shared across processes.
+    The full text is stored on disk and compared on lookup.
+    """
+
+    def __init__(self, path: str, maxsize: int):
+        self._path    = path
+        self._maxsize = maxsize
+        self._lru     = OrderedDict()
+        self._lock    = threading.Lock()
+        self._conn    = None
+        self.hits     = 0
+        self.disk_hits = 0
+        self.misses   = 0
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self._path, check_same_thread=False)
+            self._conn.execute(CREATE_EMBEDDING_TABLE_SQL)
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key: str, embedding: np.ndarray) -> None:
+        self._lru[key] = embedding
+        self._lru.move_to_end(key)
+        if len(self._lru) > self._maxsize:
+            self._lru.popitem(last=False)
+
+    def get(self, text: str) -> np.ndarray | None:
+        key = self._key(text)
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return self._lru[key]
+
+            row = self._connect().execute(
+                "SELECT text, embedding FROM embedding_cache WHERE text_hash = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None or row[0] != text:
+                self.misses += 1
+                return None
+
+            embedding = np.frombuffer(row[1], dtype=np.float32)
+            self._remember(key, embedding)
+            self.disk_hits += 1
+            return embedding
+
+    def put(self, text: str, embedding: np.ndarray) -> None:
+        key = self._key(text)
+        with self._lock:
+            self._remember(key, embedding)
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO embedding_cache (text_hash, text, embedding) VALUES (?, ?, ?)",
+                (key, text, embedding.tobytes())
+            )
+            conn.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.hits,
+            "disk_hits":   self.disk_hits,
+            "misses":      self.misses,
+            "hit_rate":    round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_size": len(self._lru),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            conn = self._connect()
+            conn.execute("DELETE FROM embedding_cache")
+            conn.commit()
+            self.hits = self.disk_hits = self.misses = 0
+
+
+_embedding_cache = _EmbeddingCache(EMBEDDING_CACHE_PATH, EMBEDDING_LRU_SIZE)
+
+
+def get_embedding_cache_stats() -> dict:
+    """Returns hit/miss counters for the embedding cache."""
+    return _embedding_cache.stats()
+
+
+def clear_embedding_cache() -> None:
+    """Empties both tiers of the embedding cache."""
+    _embedding_cache.clear()
+
+
+# ── QUANTIZATION ───────────────────────────────────────────────────────────────
+
+def quantize_embedding_i8(embedding: np.ndarray | list[float]) -> tuple[np.ndarray, float]:
+    """
+    Symmetric per-vector int8 quantization of an embedding.
+    The vector is L2-normalized in float32 first so cosine similarity is
+    preserved; the int8 vector is 4x smaller than float32.
+
+    Args:
+        embedding: Embedding as a float array (or list of floats).
+
+    Returns:
+        Tuple of (int8 numpy array, scale). Dequantize with `q * scale`.
+    """
+    vec  = np.asarray(embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(vec))
+    if norm:
+        vec = vec / norm
+
+    scale = float(np.max(np.abs(vec))) / 127 or 1.0
+    return np.round(vec / scale).astype(np.int8), scale
+
 
 # ── EMBEDDER ───────────────────────────────────────────────────────────────────
 
-def generate_embedding(normalized_log: dict) -> list[float]:
+def generate_embeddings_batch(normalized_logs: list[dict]) -> np.ndarray:
+    """
+    Generates vector embeddings for many normalized OIC logs, packing up to
+    GEMINI_EMBED_BATCH_LIMIT texts into each Gemini request.
+    Texts already in the embedding cache are not sent.
+
+    Args:
+        normalized_logs: List of normalized log dicts (output of normalize_log).
+
+    Returns:
+        float32 array of shape (N, dims) — one row per input log, same order.
+
+    Raises:
+        ValueError: If any embedding text is empty.
+        Exception:  If the Gemini API call fails.
+    """
+
+    # ── Step 1: Build embedding text from selected fields
+    texts = get_embedding_texts_batch(normalized_logs)
+
+    for i, text in enumerate(texts):
+        if not text.strip():
+            raise ValueError(f"Embedding text is empty for log {i} — check the normalized log fields.")
+
+    # ── Step 2: Serve what we can from the cache
+    found   = {}
+    pending = []
+    for text in dict.fromkeys(texts):
+        embedding = _embedding_cache.get(text)
+        if embedding is None:
+            pending.append(text)
+        else:
+            found[text] = embedding
+
+    if found:
+        logger.info("Embedding cache: %s hit(s), %s to generate.", len(found), len(pending))
+
+    # ── Step 3: Call Gemini embedding model in chunks for the misses
+    for start in range(0, len(pending), GEMINI_EMBED_BATCH_LIMIT):
+        chunk = pending[start:start + GEMINI_EMBED_BATCH_LIMIT]
+        logger.info("Generating %s embedding(s) using %s ...", len(chunk), EMBEDDING_MODEL)
+
+        response = client.models.embed_content(
+            model=EMBEDDING_MODEL,
+            contents=chunk
+        )
+        for text, e in zip(chunk, response.embeddings):
+            embedding = np.asarray(e.values, dtype=np.float32)
+            found[text] = embedding
+            _embedding_cache.put(text, embedding)
+
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+
+    embeddings = np.vstack([found[text] for text in texts])
+    logger.info("Embeddings ready. Count: %s | Dimensions: %s", *embeddings.shape)
+
+    return embeddings
+
+
+def generate_embedding(normalized_log: dict) -> np.ndarray:
     """
     Generates a vector embedding from a normalized OIC log.
 
@@ -21,30 +229,67 @@ def generate_embedding(normalized_log: dict) -> list[float]:
         normalized_log: Normalized log dict (output of normalize_log).
 
     Returns:
-        Embedding as a list of floats.
+        Embedding as a 1-D float32 numpy array.
 
     Raises:
         ValueError: If the embedding text is empty.
         Exception:  If the Gemini API call fails.
     """
+    return generate_embeddings_batch([normalized_log])[0]
 
-    # ── Step 1: Build embedding text from selected fields
+
+def generate_embedding_quantized(normalized_log: dict) -> tuple[np.ndarray, float]:
+    """
+    Generates an embedding and quantizes it to int8 at the boundary.
+
+    Args:
+        normalized_log: Normalized log dict (output of normalize_log).
+
+    Returns:
+        Tuple of (int8 numpy array of the unit-length embedding, scale).
+
+    Raises:
+        ValueError: If the embedding text is empty.
+        Exception:  If the Gemini API call fails.
+    """
+    return quantize_embedding_i8(generate_embedding(normalized_log))
+
+
+async def agenerate_embedding(normalized_log: dict) -> np.ndarray:
+    """
+    Async variant of generate_embedding — awaits Gemini on the shared async client.
+    Only a cache miss goes through call_gemini (rate limit + 429 retry).
+
+    Args:
+        normalized_log: Normalized log dict (output of normalize_log).
+
+    Returns:
+        Embedding as a 1-D float32 numpy array.
+
+    Raises:
+        ValueError: If the embedding text is empty.
+        Exception:  If the Gemini API call fails.
+    """
     embedding_text = get_embedding_text(normalized_log)
 
     if not embedding_text.strip():
         raise ValueError("Embedding text is empty — check the normalized log fields.")
 
-    logger.info(f"Embedding text: {embedding_text[:120]}...")
+    cached = _embedding_cache.get(embedding_text)
+    if cached is not None:
+        logger.info("Embedding cache hit — skipping Gemini call.")
+        return cached
 
-    # ── Step 2: Call Gemini embedding model
-    logger.info(f"Generating embedding using {EMBEDDING_MODEL} ...")
+    logger.info("Generating embedding using %s (async) ...", EMBEDDING_MODEL)
 
-    response = client.models.embed_content(
+    response = await call_gemini(
+        async_client.models.embed_content,
         model=EMBEDDING_MODEL,
         contents=embedding_text
     )
 
-    embedding = response.embeddings[0].values
-    logger.info(f"Embedding generated. Dimensions: {len(embedding)}")
+    embedding = np.asarray(response.embeddings[0].values, dtype=np.float32)
+    _embedding_cache.put(embedding_text, embedding)
+    logger.info("Embedding generated. Dimensions: %s", len(embedding))
 
-    return embedding
\ No newline at end of file
+    return embedding
@@ -0,0 +1,55 @@
+"""
+gemini_rate.py
+--------------
+Shared Gemini request throttling for OIC-LogLens.
+
+Every async Gemini request in this process goes through call_gemini:
+GEMINI_MAX_IN_FLIGHT caps concurrent requests, GEMINI_RATE (OLL_GEMINI_RPM)
+meters them, and only a 429 answer is retried (exponential + jitter).
+Wrap the network call itself — never a function that may be served from a
+cache — so cache hits are not held to the request budget.
+"""
+
+import asyncio
+from aiolimiter import AsyncLimiter
+from google.genai import errors
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+from config import GEMINI_RPM
+
+# ── LIMITS ─────────────────────────────────────────────────────────────────────
+
+GEMINI_MAX_IN_FLIGHT = 16
+GEMINI_RATE          = AsyncLimiter(1, 60 / GEMINI_RPM)   # token bucket refilled at GEMINI_RPM/60 per second
+GEMINI_MAX_ATTEMPTS  = 6
+
+_gemini_slots = asyncio.Semaphore(GEMINI_MAX_IN_FLIGHT)
+
+
+def _is_rate_limited(e: BaseException) -> bool:
+    return isinstance(e, errors.APIError) and e.code == 429
+
+
+async def call_gemini(fn, *args, **kwargs):
+    """
+    Awaits a Gemini request under the in-flight cap and the rate limiter,
+    retrying with exponential backoff + jitter only when the API reports
+    rate limiting.
+
+    Args:
+        fn:       Coroutine function that sends one Gemini request.
+        *args:    Positional arguments for fn.
+        **kwargs: Keyword arguments for fn.
+
+    Returns:
+        Whatever fn returns.
+    """
+    async for attempt in AsyncRetrying(
+        retry=retry_if_exception(_is_rate_limited),
+        wait=wait_exponential_jitter(initial=1, max=30),
+        stop=stop_after_attempt(GEMINI_MAX_ATTEMPTS),
+        reraise=True
+    ):
+        with attempt:
+            async with _gemini_slots, GEMINI_RATE:
+                return await fn(*args, **kwargs)
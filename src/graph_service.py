@@ -6,6 +6,7 @@ Reads and writes the OIC_KB_GRAPH (Oracle Property Graph).
 
 Two primary responsibilities:
   1. add_log_to_graph()      — called during ingestion, writes nodes + edges
+     (add_logs_to_graph() does the same for a batch in one transaction)
   2. enrich_search_results() — called during search, adds KG insights to matches
 
 Node Types : FlowCode | Error | Endpoint | RootCause | JiraTicket
@@ -13,24 +14,15 @@ Edge Types : HAD_ERROR | ON_ENDPOINT | HAS_ROOT_CAUSE | LOGGED_IN
              DUPLICATE_OF | RELATED_TO | FIXED_BY
 """
 
-import json
+import orjson
 import uuid
+import logging
+import threading
 import oracledb
+from collections import OrderedDict
+from db import get_connection, new_ids, ORA_UNIQUE_VIOLATION   # shared pool — conn.close() releases to it
 from config import logger
 
-# ── CONNECTION CONFIG ──────────────────────────────────────────────────────────
-
-DB_USER     = "EA_APP"
-DB_PASSWORD = "jnjnuh"
-DB_DSN      = "localhost/FREEPDB1"
-
-
-# ── CONNECTION ─────────────────────────────────────────────────────────────────
-
-def get_connection() -> oracledb.Connection:
-    conn = oracledb.connect(user=DB_USER, password=DB_PASSWORD, dsn=DB_DSN)
-    return conn
-
 
 # ── SQL ────────────────────────────────────────────────────────────────────────
 
@@ -43,53 +35,103 @@ WHEN NOT MATCHED THEN
     VALUES (:node_id, :node_type, :node_value, :properties, CURRENT_TIMESTAMP)
 """
 
-INSERT_EDGE_SQL = """
-INSERT INTO OIC_KB_GRAPH_EDGES (EDGE_ID, FROM_NODE, TO_NODE, EDGE_TYPE, PROPERTIES, CREATED_AT)
-VALUES (:edge_id, :from_node, :to_node, :edge_type, :properties, CURRENT_TIMESTAMP)
+UPSERT_EDGE_SQL = """
+MERGE INTO OIC_KB_GRAPH_EDGES tgt
+USING (SELECT :from_node AS FROM_NODE, :to_node AS TO_NODE, :edge_type AS EDGE_TYPE FROM DUAL) src
+ON (tgt.FROM_NODE = src.FROM_NODE AND tgt.TO_NODE = src.TO_NODE AND tgt.EDGE_TYPE = src.EDGE_TYPE)
+WHEN NOT MATCHED THEN
+    INSERT (EDGE_ID, FROM_NODE, TO_NODE, EDGE_TYPE, PROPERTIES, CREATED_AT)
+    VALUES (:edge_id, :from_node, :to_node, :edge_type, :properties, CURRENT_TIMESTAMP)
 """
 
-CHECK_EDGE_SQL = """
-SELECT COUNT(*) FROM OIC_KB_GRAPH_EDGES
-WHERE FROM_NODE = :from_node
-  AND TO_NODE   = :to_node
-  AND EDGE_TYPE = :edge_type
-"""
+# Enrichment fetch sizing — prefetchrows > expected rows means one round-trip
+ENRICH_ARRAYSIZE = 500
+
+# Declared bind types for the batched node/edge writes
+GRAPH_INPUT_SIZES = {
+    "properties": oracledb.DB_TYPE_CLOB,
+}
 
 # ── FIX: Scoped KG insights query ─────────────────────────────────────────────
 # Traverse: JiraTicket --[LOGGED_IN (reverse)]--> FlowCode --[HAD_ERROR]--> Error
 #           Error --[ON_ENDPOINT]--> Endpoint
 #           Error --[HAS_ROOT_CAUSE]--> RootCause
 # Scoped to this specific JiraTicket so we don't bleed data across logs.
-
-GET_KG_INSIGHTS_SQL = """
-SELECT
-    n2.NODE_TYPE,
-    n2.NODE_VALUE,
-    e1.EDGE_TYPE
-FROM OIC_KB_GRAPH_EDGES e1
+#
+# Fetches, for ALL matches in one round-trip, what used to take three queries
+# per match. The matches are bound as one JSON array and expanded with
+# JSON_TABLE; ORD maps each row back to its match.
+#   INSIGHT    — Endpoint / RootCause edges of the match's JiraTicket
+#   RECURRENCE — JiraTickets of the match's FlowCode that hit the same Error
+#   RELATED    — DUPLICATE_OF / RELATED_TO tickets
+# KIND tags the branch; a NULL flow/error node yields a recurrence count of 0.
+
+ENRICH_MATCHES_SQL = """
+WITH m AS (
+    SELECT *
+    FROM JSON_TABLE(:matches, '$[*]' COLUMNS (
+        ORD        NUMBER        PATH '$.ord',
+        JIRA_NODE  VARCHAR2(200) PATH '$.jira_node',
+        FLOW_NODE  VARCHAR2(200) PATH '$.flow_node',
+        ERROR_NODE VARCHAR2(200) PATH '$.error_node'
+    ))
+)
+SELECT m.ORD, 'INSIGHT' AS KIND, n2.NODE_VALUE, e1.EDGE_TYPE, NULL AS CNT
+FROM m
+JOIN OIC_KB_GRAPH_EDGES e1 ON e1.FROM_NODE = m.JIRA_NODE
+                          AND e1.EDGE_TYPE IN ('ON_ENDPOINT', 'HAS_ROOT_CAUSE')
 JOIN OIC_KB_GRAPH_NODES n2 ON e1.TO_NODE = n2.NODE_ID
-WHERE e1.FROM_NODE  = :jira_node
-  AND e1.EDGE_TYPE IN ('ON_ENDPOINT', 'HAS_ROOT_CAUSE')
+UNION ALL
+SELECT m.ORD, 'RECURRENCE', NULL, NULL, (
+    SELECT COUNT(*)
+    FROM OIC_KB_GRAPH_EDGES e1
+    JOIN OIC_KB_GRAPH_EDGES e2 ON e1.TO_NODE   = e2.FROM_NODE
+                               AND e2.EDGE_TYPE = 'HAD_ERROR'
+                               AND e2.TO_NODE   = m.ERROR_NODE
+    WHERE e1.FROM_NODE = m.FLOW_NODE
+      AND e1.EDGE_TYPE = 'LOGGED_IN'
+      AND e1.TO_NODE   LIKE 'JiraTicket:%'
+)
+FROM m
+UNION ALL
+SELECT m.ORD, 'RELATED', n2.NODE_VALUE, e.EDGE_TYPE, NULL
+FROM m
+JOIN OIC_KB_GRAPH_EDGES e  ON e.FROM_NODE = m.JIRA_NODE
+                          AND e.EDGE_TYPE IN ('DUPLICATE_OF', 'RELATED_TO')
+JOIN OIC_KB_GRAPH_NODES n2 ON e.TO_NODE = n2.NODE_ID
 """
 
-GET_RECURRENCE_SQL = """
-SELECT COUNT(*)
-FROM OIC_KB_GRAPH_EDGES e1
-JOIN OIC_KB_GRAPH_EDGES e2 ON e1.TO_NODE   = e2.FROM_NODE
-                           AND e2.EDGE_TYPE = 'HAD_ERROR'
-                           AND e2.TO_NODE   = :error_node
-WHERE e1.FROM_NODE = :flow_node
-  AND e1.EDGE_TYPE = 'LOGGED_IN'
-  AND e1.TO_NODE   LIKE 'JiraTicket:%'
-"""
 
-GET_RELATED_TICKETS_SQL = """
-SELECT n2.NODE_VALUE AS related_jira
-FROM OIC_KB_GRAPH_EDGES e
-JOIN OIC_KB_GRAPH_NODES n2 ON e.TO_NODE = n2.NODE_ID
-WHERE e.FROM_NODE = :jira_node
-  AND e.EDGE_TYPE IN ('DUPLICATE_OF', 'RELATED_TO')
-"""
+# ── KNOWN EDGES ────────────────────────────────────────────────────────────────
+# In-process LRU of (from, to, type) edges already committed to
+# OIC_KB_GRAPH_EDGES. Logs keep re-producing the same FlowCode → Error edges,
+# so known edges are dropped before they are sent to Oracle. The MERGE stays
+# the source of truth — a miss here just means "let Oracle decide".
+
+KNOWN_EDGES_SIZE = 100_000
+
+_known_edges      = OrderedDict()
+_known_edges_lock = threading.Lock()
+
+
+def _remember_edges(edge_keys: list[tuple]) -> None:
+    with _known_edges_lock:
+        for key in edge_keys:
+            _known_edges[key] = True
+            _known_edges.move_to_end(key)
+        while len(_known_edges) > KNOWN_EDGES_SIZE:
+            _known_edges.popitem(last=False)
+
+
+def _unknown_edges(edge_keys: list[tuple]) -> list[tuple]:
+    with _known_edges_lock:
+        return [key for key in edge_keys if key not in _known_edges]
+
+
+def clear_edge_cache() -> None:
+    """Forgets every known edge (e.g. after the graph tables are truncated)."""
+    with _known_edges_lock:
+        _known_edges.clear()
 
 
 # ── HELPERS ────────────────────────────────────────────────────────────────────
@@ -98,122 +140,178 @@ def _make_node_id(node_type: str, node_value: str) -> str:
     return f"{node_type}:{node_value}"[:200]
 
 
-def _upsert_node(cursor, node_type: str, node_value: str, properties: dict = None) -> str:
-    node_id = _make_node_id(node_type, node_value)
-    props   = json.dumps(properties) if properties else None
-
-    cursor.execute(UPSERT_NODE_SQL, {
-        "node_id":    node_id,
+def _node_params(node_type: str, node_value: str, properties: dict = None) -> dict:
+    return {
+        "node_id":    _make_node_id(node_type, node_value),
         "node_type":  node_type,
         "node_value": node_value[:500],
-        "properties": props
-    })
+        "properties": orjson.dumps(properties).decode() if properties else None
+    }
+
 
-    return node_id
+def _edge_params(from_node: str, to_node: str, edge_type: str, properties: dict = None, edge_id: str = None) -> dict:
+    return {
+        "edge_id":    edge_id or str(uuid.uuid4()),
+        "from_node":  from_node,
+        "to_node":    to_node,
+        "edge_type":  edge_type,
+        "properties": orjson.dumps(properties).decode() if properties else None
+    }
 
 
 def _insert_edge(cursor, from_node: str, to_node: str, edge_type: str, properties: dict = None):
-    cursor.execute(CHECK_EDGE_SQL, {
-        "from_node": from_node,
-        "to_node":   to_node,
-        "edge_type": edge_type
-    })
-    count = cursor.fetchone()[0]
-
-    if count > 0:
-        logger.info(f"Edge already exists: {from_node} --[{edge_type}]--> {to_node}")
+    if not _unknown_edges([(from_node, to_node, edge_type)]):
+        logger.debug("Edge already exists: %s --[%s]--> %s", from_node, edge_type, to_node)
         return
 
-    props = json.dumps(properties) if properties else None
-
-    cursor.execute(INSERT_EDGE_SQL, {
-        "edge_id":    str(uuid.uuid4()),
-        "from_node":  from_node,
-        "to_node":    to_node,
-        "edge_type":  edge_type,
-        "properties": props
-    })
+    cursor.execute(UPSERT_EDGE_SQL, _edge_params(from_node, to_node, edge_type, properties))
 
-    logger.info(f"Edge created: {from_node} --[{edge_type}]--> {to_node}")
+    if cursor.rowcount:
+        logger.debug("Edge created: %s --[%s]--> %s", from_node, edge_type, to_node)
+    else:
+        logger.debug("Edge already exists: %s --[%s]--> %s", from_node, edge_type, to_node)
 
 
 # ── WRITE: ADD LOG TO GRAPH ────────────────────────────────────────────────────
 
-def add_log_to_graph(normalized_log: dict, jira_id: str) -> bool:
+def _graph_params(normalized_log: dict, jira_id: str) -> tuple[list[dict], list[tuple]] | None:
+    """
+    Builds the node bind dicts and (from, to, type) edge triples for one log
+    without touching the database. Returns None if the log has neither a
+    flow code nor an error code.
+    """
+    flow  = normalized_log.get("flow")  or {}
+    error = normalized_log.get("error") or {}
+    msg   = error.get("message_parsed") or {}
+
+    flow_code   = flow.get("code")
+    trigger     = flow.get("trigger_type")
+    error_code  = error.get("code")
+    endpoint    = error.get("endpoint_name")
+    root_cause  = msg.get("root_cause")
+
+    if not flow_code and not error_code:
+        logger.warning("graph_service: skipping — no flow_code or error_code found")
+        return None
+
+    nodes = []
+
+    def node(node_type: str, node_value: str, properties: dict = None) -> str:
+        params = _node_params(node_type, node_value, properties)
+        nodes.append(params)
+        return params["node_id"]
+
+    flow_node  = None
+    error_node = None
+    ep_node    = None
+    rc_node    = None
+    jira_node  = None
+
+    if flow_code:
+        flow_node = node(
+            "FlowCode", flow_code,
+            properties={"trigger_type": trigger} if trigger else None
+        )
+
+    if error_code:
+        error_node = node("Error", error_code)
+
+    if endpoint:
+        ep_node = node("Endpoint", endpoint)
+
+    if root_cause:
+        rc_node = node("RootCause", root_cause)
+
+    if jira_id:
+        ticket_id = jira_id.split("/")[-1] if "/" in jira_id else jira_id
+        jira_node = node(
+            "JiraTicket", ticket_id,
+            properties={"full_url": jira_id}
+        )
+
+    edge_pairs = [
+        (flow_node,  error_node, "HAD_ERROR"),
+        (error_node, ep_node,    "ON_ENDPOINT"),
+        (error_node, rc_node,    "HAS_ROOT_CAUSE"),
+        (flow_node,  jira_node,  "LOGGED_IN"),
+        # ── Direct JiraTicket edges for scoped KG insights ─────────────────────
+        # Allows ENRICH_MATCHES_SQL to find the exact Error/Endpoint/RootCause
+        # for THIS ticket without bleeding across shared FlowCode nodes.
+        (jira_node,  error_node, "HAD_ERROR"),
+        (jira_node,  ep_node,    "ON_ENDPOINT"),
+        (jira_node,  rc_node,    "HAS_ROOT_CAUSE"),
+    ]
+
+    return nodes, [pair for pair in edge_pairs if pair[0] and pair[1]]
+
+
+def add_logs_to_graph(logs: list[tuple[dict, str]]) -> int:
+    """
+    Writes the nodes + edges of many logs in one transaction — two
+    executemany calls and a single commit for the whole batch. Rows that
+    fail (e.g. ORA-00001 from a concurrent writer) are logged and skipped
+    instead of rolling back the rest of the batch.
+
+    Args:
+        logs: List of (normalized_log, jira_id) tuples.
+
+    Returns:
+        Number of logs written to the graph (0 on failure — non-fatal).
+    """
     try:
-        flow  = normalized_log.get("flow")  or {}
-        error = normalized_log.get("error") or {}
-        msg   = error.get("message_parsed") or {}
-
-        flow_code   = flow.get("code")
-        trigger     = flow.get("trigger_type")
-        error_code  = error.get("code")
-        endpoint    = error.get("endpoint_name")
-        root_cause  = msg.get("root_cause")
-
-        if not flow_code and not error_code:
-            logger.warning("graph_service: skipping — no flow_code or error_code found")
-            return False
+        nodes      = []
+        edge_pairs = []
+        written    = 0
+
+        for normalized_log, jira_id in logs:
+            params = _graph_params(normalized_log, jira_id)
+            if params:
+                nodes.extend(params[0])
+                edge_pairs.extend(params[1])
+                written += 1
+
+        if not written:
+            return 0
+
+        # Logs in a batch share FlowCode/Error/... nodes — dedupe so one array
+        # DML never MERGEs the same key twice (first occurrence wins, as before)
+        unique_nodes = {}
+        for node in nodes:
+            unique_nodes.setdefault(node["node_id"], node)
+        nodes      = list(unique_nodes.values())
+        all_pairs  = list(dict.fromkeys(edge_pairs))
+        edge_pairs = _unknown_edges(all_pairs)
+
+        edges = [
+            _edge_params(from_node, to_node, edge_type, edge_id=edge_id)
+            for (from_node, to_node, edge_type), edge_id in zip(edge_pairs, new_ids(len(edge_pairs)))
+        ]
 
         conn   = get_connection()
         cursor = conn.cursor()
 
         try:
-            flow_node  = None
-            error_node = None
-            ep_node    = None
-            rc_node    = None
-            jira_node  = None
-
-            if flow_code:
-                flow_node = _upsert_node(
-                    cursor, "FlowCode", flow_code,
-                    properties={"trigger_type": trigger} if trigger else None
-                )
-
-            if error_code:
-                error_node = _upsert_node(cursor, "Error", error_code)
-
-            if endpoint:
-                ep_node = _upsert_node(cursor, "Endpoint", endpoint)
-
-            if root_cause:
-                rc_node = _upsert_node(cursor, "RootCause", root_cause)
-
-            if jira_id:
-                ticket_id = jira_id.split("/")[-1] if "/" in jira_id else jira_id
-                jira_node = _upsert_node(
-                    cursor, "JiraTicket", ticket_id,
-                    properties={"full_url": jira_id}
-                )
-
-            if flow_node and error_node:
-                _insert_edge(cursor, flow_node, error_node, "HAD_ERROR")
-
-            if error_node and ep_node:
-                _insert_edge(cursor, error_node, ep_node, "ON_ENDPOINT")
-
-            if error_node and rc_node:
-                _insert_edge(cursor, error_node, rc_node, "HAS_ROOT_CAUSE")
-
-            if flow_node and jira_node:
-                _insert_edge(cursor, flow_node, jira_node, "LOGGED_IN")
-
-            # ── Direct JiraTicket edges for scoped KG insights ─────────────────
-            # Allows GET_KG_INSIGHTS_SQL to find the exact Error/Endpoint/RootCause
-            # for THIS ticket without bleeding across shared FlowCode nodes.
-            if jira_node and error_node:
-                _insert_edge(cursor, jira_node, error_node, "HAD_ERROR")
-
-            if jira_node and ep_node:
-                _insert_edge(cursor, jira_node, ep_node, "ON_ENDPOINT")
-
-            if jira_node and rc_node:
-                _insert_edge(cursor, jira_node, rc_node, "HAS_ROOT_CAUSE")
+            cursor.setinputsizes(**GRAPH_INPUT_SIZES)
+            cursor.executemany(UPSERT_NODE_SQL, nodes, batcherrors=True)
+            for error in cursor.getbatcherrors():
+                logger.warning(f"graph_service: node {nodes[error.offset]['node_id']} not written: {error.message}")
+
+            failed_pairs = set()
+            if edges:
+                cursor.setinputsizes(**GRAPH_INPUT_SIZES)
+                cursor.executemany(UPSERT_EDGE_SQL, edges, batcherrors=True, arraydmlrowcounts=True)
+                for error in cursor.getbatcherrors():
+                    # a concurrent writer already created the edge — it exists either way
+                    if error.code != ORA_UNIQUE_VIOLATION:
+                        failed_pairs.add(edge_pairs[error.offset])
+                        logger.warning(f"graph_service: edge {edge_pairs[error.offset]} not written: {error.message}")
+                created = sum(cursor.getarraydmlrowcounts())
+                logger.info(f"graph_service: {created} edge(s) created, {len(all_pairs) - created} already existed")
 
             conn.commit()
-            logger.info(f"graph_service: log added to graph | flow={flow_code} | jira={jira_id}")
-            return True
+            _remember_edges([pair for pair in all_pairs if pair not in failed_pairs])
+            logger.info(f"graph_service: {written} log(s) added to graph")
+            return written
 
         except Exception as e:
             conn.rollback()
@@ -225,8 +323,12 @@ def add_log_to_graph(normalized_log: dict, jira_id: str) -> bool:
             conn.close()
 
     except Exception as e:
-        logger.error(f"graph_service: add_log_to_graph failed: {e}")
-        return False
+        logger.error(f"graph_service: add_logs_to_graph failed: {e}")
+        return 0
+
+
+def add_log_to_graph(normalized_log: dict, jira_id: str) -> bool:
+    return add_logs_to_graph([(normalized_log, jira_id)]) == 1
 
 
 # ── WRITE: ADD JIRA RELATIONSHIP ───────────────────────────────────────────────
@@ -252,6 +354,7 @@ def add_jira_relationship(
         try:
             _insert_edge(cursor, from_node, to_node, edge_type, properties=props)
             conn.commit()
+            _remember_edges([(from_node, to_node, edge_type)])
             logger.info(f"graph_service: {from_ticket} --[{edge_type}]--> {to_ticket}")
             return True
 
@@ -268,59 +371,78 @@ def add_jira_relationship(
 
 def enrich_search_results(matches: list[dict]) -> list[dict]:
     try:
+        params = []
+        for i, match in enumerate(matches):
+            jira_id    = match.get("jira_id", "")
+            flow_code  = match.get("flow_code", "")
+            error_code = match.get("error_code", "")
+
+            ticket_id  = jira_id.split("/")[-1] if "/" in jira_id else jira_id
+            params.append({
+                "ord":        i,
+                "jira_node":  _make_node_id("JiraTicket", ticket_id),
+                "flow_node":  _make_node_id("FlowCode", flow_code)  if flow_code  else None,
+                "error_node": _make_node_id("Error",    error_code) if error_code else None
+            })
+
+        if not params:
+            return matches
+
+        insights = [
+            {
+                "root_cause":       None,
+                "endpoints":        [],
+                "recurrence_count": 0,
+                "related_tickets":  []
+            }
+            for _ in matches
+        ]
+        seen_endpoints = [set() for _ in matches]   # O(1) dedupe, list keeps first-seen order
+
         conn   = get_connection()
         cursor = conn.cursor()
 
+        # Drain every match's rows in the execute round-trip itself
+        cursor.arraysize    = ENRICH_ARRAYSIZE
+        cursor.prefetchrows = ENRICH_ARRAYSIZE + 1
+
         try:
-            for match in matches:
-                jira_id    = match.get("jira_id", "")
-                flow_code  = match.get("flow_code", "")
-                error_code = match.get("error_code", "")
-
-                ticket_id  = jira_id.split("/")[-1] if "/" in jira_id else jira_id
-                jira_node  = _make_node_id("JiraTicket", ticket_id)
-                flow_node  = _make_node_id("FlowCode", flow_code)  if flow_code  else None
-                error_node = _make_node_id("Error",    error_code) if error_code else None
-
-                insights = {
-                    "root_cause":       None,
-                    "endpoints":        [],
-                    "recurrence_count": 0,
-                    "related_tickets":  []
-                }
-
-                # ── Scoped insights: traverse via JiraTicket → FlowCode → Error ──
-                cursor.execute(GET_KG_INSIGHTS_SQL, {"jira_node": jira_node})
-                rows = cursor.fetchall()
-                for node_type, node_value, edge_type in rows:
+            # ── Scoped insights, recurrence count and related tickets ──────────
+            # Recurrence counts JiraTickets for this specific FlowCode that
+            # also had this same Error — i.e. how many times THIS flow hit
+            # THIS error. All matches come back from a single statement.
+            cursor.setinputsizes(matches=oracledb.DB_TYPE_CLOB)
+            cursor.execute(ENRICH_MATCHES_SQL, {"matches": orjson.dumps(params).decode()})
+
+            for ord_, kind, node_value, edge_type, count in cursor:
+                i     = int(ord_)
+                found = insights[i]
+                if kind == "INSIGHT":
                     if edge_type == "HAS_ROOT_CAUSE":
-                        insights["root_cause"] = node_value
+                        found["root_cause"] = node_value
                     elif edge_type == "ON_ENDPOINT":
-                        if node_value not in insights["endpoints"]:
-                            insights["endpoints"].append(node_value)
-
-                # ── Recurrence count ───────────────────────────────────────────
-                # Counts JiraTickets for this specific FlowCode that also had
-                # this same Error — i.e. how many times THIS flow hit THIS error.
-                if flow_node and error_node:
-                    cursor.execute(GET_RECURRENCE_SQL, {
-                        "flow_node":  flow_node,
-                        "error_node": error_node
-                    })
-                    insights["recurrence_count"] = cursor.fetchone()[0]
-
-                # ── Related Jira tickets ───────────────────────────────────────
-                if jira_node:
-                    cursor.execute(GET_RELATED_TICKETS_SQL, {"jira_node": jira_node})
-                    insights["related_tickets"] = [row[0] for row in cursor.fetchall()]
-
-                match["kg_insights"] = insights
-                logger.info(f"graph_service: enriched {ticket_id} | root_cause={insights['root_cause']} | recurrence={insights['recurrence_count']}")
+                        seen = seen_endpoints[i]
+                        if node_value not in seen:
+                            seen.add(node_value)
+                            found["endpoints"].append(node_value)
+                elif kind == "RECURRENCE":
+                    found["recurrence_count"] = count
+                else:
+                    found["related_tickets"].append(node_value)
 
         finally:
             cursor.close()
             conn.close()
 
+        # Per-match detail is DEBUG only — the loop skips formatting entirely otherwise
+        log_each = logger.isEnabledFor(logging.DEBUG)
+        for match, param, found in zip(matches, params, insights):
+            match["kg_insights"] = found
+            if log_each:
+                logger.debug(f"graph_service: enriched {param['jira_node'].split(':', 1)[1]} | root_cause={found['root_cause']} | recurrence={found['recurrence_count']}")
+
+        logger.info(f"graph_service: enriched {len(matches)} match(es)")
+
     except Exception as e:
         logger.error(f"graph_service: enrich_search_results failed: {e}")
 
@@ -5,25 +5,54 @@ Core ingestion pipeline and source loaders for OIC-LogLens.
 Provides reusable functions for all ingestion endpoints.
 """
 
-import json
 import os
-import hashlib
-from typing import Dict, Any, List
+import mmap
+import stat
+import functools
+import threading
+import oracledb
+import httpx
+import orjson
+from typing import Dict, Any, List, Iterator
+from collections import OrderedDict
 from fastapi import HTTPException, status
-
-from normalizer import normalize_log
-from embedder import generate_embedding
-from prompts import get_embedding_text
-from db import insert_log, check_duplicate
-from graph_service import add_log_to_graph
+from fastapi.concurrency import run_in_threadpool
+
+from normalizer import normalize_log, anormalize_log
+from embedder import generate_embedding, generate_embeddings_batch, agenerate_embedding
+from prompts import get_embedding_text, get_embedding_texts_batch
+from db import fetch_lobs_inline, encode_raw_log, known_duplicate_cached, is_known_duplicate, insert_log, insert_logs_bulk, DuplicateLogError, ORA_UNIQUE_VIOLATION
+from graph_service import add_log_to_graph, add_logs_to_graph
+from gemini_rate import call_gemini
 from config import logger
 
 
 # ── SOURCE LOADERS ─────────────────────────────────────────────────────────────
 
+URL_CHUNK_BYTES = 64 * 1024
+
+# Pooled client for load_from_url — repeat fetches from the same host reuse
+# the TCP/TLS connection instead of handshaking per request.
+URL_TIMEOUT_SECONDS = 30.0
+
+_url_client = httpx.Client(
+    transport=httpx.HTTPTransport(limits=httpx.Limits(
+        max_connections=128,
+        max_keepalive_connections=32
+    )),
+    timeout=URL_TIMEOUT_SECONDS,
+    follow_redirects=True
+)
+
+FILE_CACHE_SIZE = 32   # parsed log files kept, keyed by (path, mtime, size)
+
+
 def load_from_file(file_path: str) -> List[Dict[str, Any]]:
     """
     Load raw log from a file path.
+    Re-loading an unchanged file (same mtime and size) is served from an
+    LRU of parsed logs — no read or parse. The returned list is shared
+    between callers and must not be mutated.
 
     Args:
         file_path: Absolute path to the log file
@@ -34,26 +63,40 @@ def load_from_file(file_path: str) -> List[Dict[str, Any]]:
     Raises:
         HTTPException: If file not found or invalid JSON
     """
-    if not os.path.exists(file_path):
+    # One stat serves the existence check, the type check and the cache key
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"File not found: {file_path}"
         )
 
-    if not os.path.isfile(file_path):
+    if not stat.S_ISREG(st.st_mode):
         logger.error(f"Path is not a file: {file_path}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Path is not a file: {file_path}"
         )
 
+    return _parse_log_file(file_path, st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=FILE_CACHE_SIZE)
+def _parse_log_file(file_path: str, mtime_ns: int, size: int) -> List[Dict[str, Any]]:
+    # mtime_ns / size only key the cache — an edited file is a new entry.
+    # Failures raise, so they are never cached.
     logger.info(f"Reading file: {file_path}")
 
     try:
-        with open(file_path, 'r') as f:
-            raw_log = json.load(f)
-    except json.JSONDecodeError as e:
+        # Parse straight from the mapped file — no read() copy of the whole
+        # file into a bytes object, and pages are faulted in as orjson scans
+        with open(file_path, 'rb') as f, \
+             mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+             memoryview(mapped) as view:
+            raw_log = orjson.loads(view)
+    except ValueError as e:   # orjson.JSONDecodeError, or mmap of an empty file
         logger.error(f"Invalid JSON in file: {e}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -83,35 +126,38 @@ def load_from_url(url: str) -> List[Dict[str, Any]]:
     Raises:
         HTTPException: If URL unreachable or invalid JSON
     """
-    import requests
-
     logger.info(f"Fetching log from URL: {url}")
 
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-    except requests.exceptions.Timeout:
+        # Stream the body in chunks straight into one buffer — no
+        # intermediate decoded str copy before parsing
+        body = bytearray()
+        with _url_client.stream("GET", url) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes(chunk_size=URL_CHUNK_BYTES):
+                body += chunk
+    except httpx.TimeoutException:
         logger.error(f"URL request timed out: {url}")
         raise HTTPException(
             status_code=status.HTTP_408_REQUEST_TIMEOUT,
             detail=f"Request timed out: {url}"
         )
-    except requests.exceptions.ConnectionError as e:
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTP error: {e}")
+        raise HTTPException(
+            status_code=e.response.status_code,
+            detail=f"HTTP {e.response.status_code}: {url}"
+        )
+    except httpx.HTTPError as e:
         logger.error(f"Connection error: {e}")
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"Could not connect to URL: {url}"
         )
-    except requests.exceptions.HTTPError as e:
-        logger.error(f"HTTP error: {e}")
-        raise HTTPException(
-            status_code=response.status_code,
-            detail=f"HTTP {response.status_code}: {url}"
-        )
 
     try:
-        raw_log = response.json()
-    except json.JSONDecodeError as e:
+        raw_log = orjson.loads(body)
+    except orjson.JSONDecodeError as e:
         logger.error(f"Invalid JSON from URL: {e}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -128,12 +174,12 @@ def load_from_url(url: str) -> List[Dict[str, Any]]:
     return raw_log
 
 
-def load_from_raw_text(log_content: str) -> List[Dict[str, Any]]:
+def load_from_raw_text(log_content: str | bytes) -> List[Dict[str, Any]]:
     """
     Load raw log from text/JSON string.
 
     Args:
-        log_content: Raw log as JSON string
+        log_content: Raw log as JSON string (or UTF-8 bytes)
 
     Returns:
         Raw log as a list of dicts
@@ -144,8 +190,8 @@ def load_from_raw_text(log_content: str) -> List[Dict[str, Any]]:
     logger.info("Parsing raw log content")
 
     try:
-        raw_log = json.loads(log_content)
-    except json.JSONDecodeError as e:
+        raw_log = orjson.loads(log_content)
+    except orjson.JSONDecodeError as e:
         logger.error(f"Invalid JSON in content: {e}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -162,28 +208,61 @@ def load_from_raw_text(log_content: str) -> List[Dict[str, Any]]:
     return raw_log
 
 
-def load_from_database(connection_string: str, query: str) -> List[List[Dict[str, Any]]]:
-    """
-    Load raw logs from a database query.
-    Supports batch ingestion - returns multiple logs if query returns multiple rows.
+# Source databases for /ingest/database — one small pool per connection
+# string, so repeat queries skip connect + auth + session setup. Bounded LRU:
+# the least recently used pool is closed once SOURCE_POOLS_MAX is exceeded.
+SOURCE_POOLS_MAX  = 8
+SOURCE_POOL_MAX   = 4
+SOURCE_POOL_WAIT  = 5000   # ms to wait for a free connection
+SOURCE_ARRAYSIZE  = 100
+
+_source_pools      = OrderedDict()
+_source_pools_lock = threading.Lock()
+
+
+def _source_pool(connection_string: str) -> oracledb.ConnectionPool:
+    with _source_pools_lock:
+        pool = _source_pools.get(connection_string)
+        if pool is None:
+            pool = oracledb.create_pool(
+                dsn=connection_string,
+                min=1,
+                max=SOURCE_POOL_MAX,
+                increment=1,
+                getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                wait_timeout=SOURCE_POOL_WAIT
+            )
+            _source_pools[connection_string] = pool
+        _source_pools.move_to_end(connection_string)
 
-    Args:
-        connection_string: Database connection string
-        query: SQL query to fetch logs (can return multiple rows)
+        while len(_source_pools) > SOURCE_POOLS_MAX:
+            _, evicted = _source_pools.popitem(last=False)
+            try:
+                evicted.close()
+            except Exception as e:
+                logger.warning(f"Could not close source pool: {e}")
 
-    Returns:
-        List of raw logs (each log is a list of dicts)
+        return pool
 
-    Raises:
-        HTTPException: If connection fails or invalid result
+
+def close_source_pools() -> None:
+    """
+    Closes every source database pool (called on API shutdown).
     """
-    import oracledb
+    with _source_pools_lock:
+        for pool in _source_pools.values():
+            try:
+                pool.close()
+            except Exception as e:
+                logger.warning(f"Could not close source pool: {e}")
+        _source_pools.clear()
+
 
+def _source_connection(connection_string: str) -> oracledb.Connection:
     logger.info(f"Connecting to database...")
 
     try:
-        conn = oracledb.connect(connection_string)
-        cursor = conn.cursor()
+        return _source_pool(connection_string).acquire()
     except Exception as e:
         logger.error(f"Database connection failed: {e}")
         raise HTTPException(
@@ -191,51 +270,66 @@ def load_from_database(connection_string: str, query: str) -> List[List[Dict[str
             detail=f"Database connection failed: {str(e)}"
         )
 
-    try:
-        logger.info(f"Executing query: {query[:100]}...")
-        cursor.execute(query)
-        results = cursor.fetchall()
 
-        if not results:
-            logger.error("Query returned no results")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Query returned no results"
-            )
+def check_database_query(connection_string: str, query: str) -> None:
+    """
+    Validates a log query before a batch job is queued — connects and has
+    Oracle parse the statement without executing it.
 
-        logger.info(f"Query returned {len(results)} row(s)")
+    Args:
+        connection_string: Database connection string
+        query: SQL query to fetch logs (can return multiple rows)
+
+    Raises:
+        HTTPException: If connection fails or the query does not parse
+    """
+    conn = _source_connection(connection_string)
 
-        raw_logs = []
+    try:
+        with conn.cursor() as cursor:
+            logger.info(f"Parsing query: {query[:100]}...")
+            cursor.parse(query)
 
-        for row in results:
-            log_json = row[0]
+    except Exception as e:
+        logger.error(f"Database query failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database query failed: {str(e)}"
+        )
 
-            if hasattr(log_json, "read"):
-                log_json = log_json.read()
+    finally:
+        conn.close()
 
-            try:
-                raw_log = json.loads(log_json)
 
-                if not isinstance(raw_log, list):
-                    logger.warning(f"Skipping row - not a JSON array")
-                    continue
+def stream_from_database(connection_string: str, query: str) -> Iterator[List[str | bytes]]:
+    """
+    Streams raw logs from a database query, SOURCE_ARRAYSIZE rows at a time,
+    so a large result set is never held in memory at once. Rows are returned
+    unparsed — run each through load_from_raw_text. The source connection is
+    held until the generator is exhausted or closed.
 
-                raw_logs.append(raw_log)
+    Args:
+        connection_string: Database connection string
+        query: SQL query to fetch logs (can return multiple rows)
 
-            except json.JSONDecodeError as e:
-                logger.warning(f"Skipping row - invalid JSON: {e}")
-                continue
+    Yields:
+        Lists of raw log JSON texts, in query order
 
-        if not raw_logs:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No valid logs found in query results"
-            )
+    Raises:
+        HTTPException: If connection or the query fails
+    """
+    conn   = _source_connection(connection_string)
+    cursor = conn.cursor()
 
-        return raw_logs
+    try:
+        logger.info(f"Executing query: {query[:100]}...")
+        # LOB log columns come back inline, SOURCE_ARRAYSIZE rows per round-trip
+        cursor.arraysize = SOURCE_ARRAYSIZE
+        cursor.outputtypehandler = fetch_lobs_inline
+        cursor.execute(query)
 
-    except HTTPException:
-        raise
+        while rows := cursor.fetchmany():
+            yield [row[0].read() if hasattr(row[0], "read") else row[0] for row in rows]
 
     except Exception as e:
         logger.error(f"Database query failed: {e}")
@@ -249,80 +343,223 @@ def load_from_database(connection_string: str, query: str) -> List[List[Dict[str
         conn.close()
 
 
+# ── GEMINI FAN-OUT ─────────────────────────────────────────────────────────────
+# Batch jobs prepare rows concurrently (aprepare_log under a semaphore of
+# BATCH_CONCURRENCY) and hand them to a store stage in STORE_BATCH_SIZE bulks.
+# No fixed pacing — the Gemini requests themselves go through
+# gemini_rate.call_gemini, so template / embedding cache hits are not held
+# to OLL_GEMINI_RPM.
+
+BATCH_CONCURRENCY    = 8
+STORE_BATCH_SIZE     = 64     # max prepared logs per bulk INSERT round-trip
+STORE_QUEUE_SIZE     = 64     # prepared logs waiting for the store stage
+
+
 # ── CORE INGESTION PIPELINE ────────────────────────────────────────────────────
 
-def ingest_log(raw_log: List[Dict[str, Any]]) -> tuple[str, str]:
+def _raise_duplicate(log_hash: str):
+    logger.warning(f"Duplicate log detected (cached): {log_hash}")
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Duplicate log: This log has already been ingested (hash: {log_hash[:16]}...)"
+    )
+
+
+def _encode_new_log(raw_log: List[Dict[str, Any]]) -> tuple[bytes, str]:
+    """
+    Step 0 of prepare_log — serializes the raw log and computes LOG_HASH,
+    rejecting hashes this process already knows are in OIC_KB_ISSUE.
+    """
+    # Serialized once here; the same bytes are stored as RAW_JSON
+    raw_json, log_hash = encode_raw_log(raw_log)
+
+    if is_known_duplicate(log_hash):
+        _raise_duplicate(log_hash)
+
+    return raw_json, log_hash
+
+
+async def _aencode_new_log(raw_log: List[Dict[str, Any]]) -> tuple[bytes, str]:
+    """
+    Async variant of _encode_new_log — the LOG_HASH lookup the Bloom filter
+    sometimes needs is a blocking SELECT, so it runs in the threadpool.
+    """
+    raw_json, log_hash = encode_raw_log(raw_log)
+
+    known = known_duplicate_cached(log_hash)
+    if known is None:
+        known = await run_in_threadpool(is_known_duplicate, log_hash)
+    if known:
+        _raise_duplicate(log_hash)
+
+    return raw_json, log_hash
+
+
+def _resolve_jira_id(normalized_log: dict, log_hash: str) -> str:
+    """
+    Step 1.5 of prepare_log — uses the extracted Jira ID, or generates an
+    OLL-<hash> ticket URL when the log doesn't carry one.
+    """
+    jira_id = normalized_log.get("jira_id")
+
+    if not jira_id:
+        jira_ticket_id = f"OLL-{log_hash[:8].upper()}"
+        jira_id = f"https://promptlyai.atlassian.net/browse/{jira_ticket_id}"
+        logger.info(f"Generated Jira ID: {jira_id}")
+    else:
+        logger.info(f"Using extracted Jira ID: {jira_id}")
+
+    return jira_id
+
+
+def prepare_log(raw_log: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
-    Core ingestion pipeline — shared by all ingestion endpoints.
+    Runs the pre-storage half of the ingestion pipeline for one log.
+
+    Hashes this process already knows are in OIC_KB_ISSUE are rejected
+    up front; anything else is left to the LOG_HASH unique constraint
+    at INSERT time.
 
     Pipeline:
-    0. Check for duplicate (LOG_HASH)
+    0. Compute LOG_HASH (reject if known duplicate)
     1. Normalize log using Gemini LLM
     2. Generate embedding vector
-    3. Store in Oracle 26ai Vector Database (OIC_KB_ISSUE)
-    4. Write nodes + edges to Knowledge Graph (OIC_KB_GRAPH) [non-fatal]
 
     Args:
         raw_log: Raw log as a list of dicts
 
     Returns:
-        Tuple of (LOG_ID, JIRA_ID)
+        Dict with the keyword arguments of db.insert_log
+        (normalized_log, raw_log, embedding, semantic_text, jira_id, raw_json)
 
     Raises:
-        HTTPException: If duplicate log or any step fails
+        HTTPException: If known duplicate log or any step fails
     """
     try:
-        # ── Step 0: Check for duplicate ────────────────────────────────────────
-        raw_json_str = json.dumps(raw_log, sort_keys=True)
-        log_hash = hashlib.sha256(raw_json_str.encode()).hexdigest()
-
-        logger.info(f"Checking for duplicate log (hash: {log_hash[:16]}...)")
-
-        if check_duplicate(log_hash):
-            logger.warning(f"Duplicate log detected: {log_hash}")
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Duplicate log: This log has already been ingested (hash: {log_hash[:16]}...)"
-            )
+        # ── Step 0: Compute LOG_HASH ───────────────────────────────────────────
+        raw_json, log_hash = _encode_new_log(raw_log)
 
         # ── Step 1: Normalize ──────────────────────────────────────────────────
         logger.info("Normalizing log...")
         normalized_log = normalize_log(raw_log)
 
         # ── Step 1.5: Extract or generate Jira ID ─────────────────────────────
-        jira_id = normalized_log.get("jira_id")
-
-        if not jira_id:
-            jira_ticket_id = f"OLL-{log_hash[:8].upper()}"
-            jira_id = f"https://promptlyai.atlassian.net/browse/{jira_ticket_id}"
-            logger.info(f"Generated Jira ID: {jira_id}")
-        else:
-            logger.info(f"Using extracted Jira ID: {jira_id}")
+        jira_id = _resolve_jira_id(normalized_log, log_hash)
 
         # ── Step 2: Generate embedding ─────────────────────────────────────────
         logger.info("Generating embedding...")
         embedding = generate_embedding(normalized_log)
         semantic_text = get_embedding_text(normalized_log)
 
+        return {
+            "normalized_log": normalized_log,
+            "raw_log":        raw_log,
+            "embedding":      embedding,
+            "semantic_text":  semantic_text,
+            "jira_id":        jira_id,
+            "raw_json":       raw_json,
+        }
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        logger.error(f"Ingestion pipeline failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ingestion failed: {str(e)}"
+        )
+
+
+async def aprepare_log(raw_log: List[Dict[str, Any]], embed: bool = True) -> Dict[str, Any]:
+    """
+    Async variant of prepare_log — awaits Gemini on the shared async client,
+    so many rows of a batch job can be prepared at once.
+
+    Args:
+        raw_log: Raw log as a list of dicts
+        embed:   False to skip Step 2 — ingest_logs_bulk then embeds the
+                 whole batch with one batched Gemini call
+
+    Returns:
+        Same dict as prepare_log (embedding / semantic_text are None
+        when embed is False).
+
+    Raises:
+        HTTPException: If known duplicate log or any step fails
+    """
+    try:
+        raw_json, log_hash = await _aencode_new_log(raw_log)
+
+        logger.info("Normalizing log (async)...")
+        normalized_log = await anormalize_log(raw_log)
+
+        jira_id = _resolve_jira_id(normalized_log, log_hash)
+
+        embedding     = None
+        semantic_text = None
+        if embed:
+            logger.info("Generating embedding (async)...")
+            embedding = await agenerate_embedding(normalized_log)
+            semantic_text = get_embedding_text(normalized_log)
+
+        return {
+            "normalized_log": normalized_log,
+            "raw_log":        raw_log,
+            "embedding":      embedding,
+            "semantic_text":  semantic_text,
+            "jira_id":        jira_id,
+            "raw_json":       raw_json,
+        }
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        logger.error(f"Ingestion pipeline failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ingestion failed: {str(e)}"
+        )
+
+
+def store_log(prepared: Dict[str, Any]) -> tuple[str, str]:
+    """
+    Runs the storage half of the ingestion pipeline for one prepared log.
+
+    Pipeline:
+    3. Store in Oracle 26ai Vector Database (OIC_KB_ISSUE) — duplicates
+       are rejected here by the LOG_HASH unique constraint
+    4. Write nodes + edges to Knowledge Graph (OIC_KB_GRAPH) [non-fatal]
+
+    Args:
+        prepared: Output of prepare_log / aprepare_log
+
+    Returns:
+        Tuple of (LOG_ID, JIRA_ID)
+
+    Raises:
+        HTTPException: If duplicate log or the insert fails
+    """
+    jira_id = prepared["jira_id"]
+
+    try:
         # ── Step 3: Store in vector database ──────────────────────────────────
         logger.info("Storing in OIC_KB_ISSUE...")
-        log_id = insert_log(
-            normalized_log=normalized_log,
-            raw_log=raw_log,
-            embedding=embedding,
-            semantic_text=semantic_text,
-            jira_id=jira_id
-        )
+        log_id = insert_log(**prepared)
 
         # ── Step 4: Write to Knowledge Graph (non-fatal) ───────────────────────
         logger.info("Writing to Knowledge Graph...")
-        add_log_to_graph(normalized_log, jira_id)
+        add_log_to_graph(prepared["normalized_log"], jira_id)
 
         logger.info(f"Ingestion successful. LOG_ID: {log_id}, JIRA_ID: {jira_id}")
         return log_id, jira_id
 
-    except HTTPException:
-        raise
+    except DuplicateLogError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Duplicate log: This log has already been ingested (hash: {e.log_hash[:16]}...)"
+        )
 
     except Exception as e:
         logger.error(f"Ingestion pipeline failed: {e}")
@@ -330,3 +567,152 @@ def ingest_log(raw_log: List[Dict[str, Any]]) -> tuple[str, str]:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Ingestion failed: {str(e)}"
         )
+
+
+def ingest_log(raw_log: List[Dict[str, Any]]) -> tuple[str, str]:
+    """
+    Core ingestion pipeline — prepare_log (hash, normalize, embed)
+    followed by store_log (vector DB + Knowledge Graph).
+
+    Args:
+        raw_log: Raw log as a list of dicts
+
+    Returns:
+        Tuple of (LOG_ID, JIRA_ID)
+
+    Raises:
+        HTTPException: If duplicate log or any step fails
+    """
+    return store_log(prepare_log(raw_log))
+
+
+async def aingest_log(raw_log: List[Dict[str, Any]]) -> tuple[str, str]:
+    """
+    Async variant of ingest_log — used by the async ingestion endpoints.
+    Gemini calls are awaited on the event loop; only the blocking Oracle
+    writes run on the threadpool.
+
+    Args:
+        raw_log: Raw log as a list of dicts
+
+    Returns:
+        Tuple of (LOG_ID, JIRA_ID)
+
+    Raises:
+        HTTPException: If duplicate log or any step fails
+    """
+    prepared = await aprepare_log(raw_log)
+    return await run_in_threadpool(store_log, prepared)
+
+
+def _embed_pending(prepared_logs: List[Dict[str, Any]]) -> Dict[int, HTTPException]:
+    """
+    Fills embedding + semantic_text in place for prepared logs that have no
+    embedding yet — one batched Gemini request per GEMINI_EMBED_BATCH_LIMIT
+    logs instead of one request per log. A log with empty embedding text is
+    left unembedded and reported on its own, so it cannot fail the batch.
+
+    Returns:
+        Dict of input offset → HTTPException for logs that could not be embedded
+    """
+    pending = [(i, prepared) for i, prepared in enumerate(prepared_logs) if prepared["embedding"] is None]
+    if not pending:
+        return {}
+
+    semantic_texts = get_embedding_texts_batch([prepared["normalized_log"] for _, prepared in pending])
+    embeddable     = []
+    errors         = {}
+
+    for (i, prepared), semantic_text in zip(pending, semantic_texts):
+        if semantic_text.strip():
+            embeddable.append((prepared, semantic_text))
+            continue
+        logger.error(f"Bulk embedding: log {i} has empty embedding text")
+        errors[i] = HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ingestion failed: Embedding text is empty — check the normalized log fields."
+        )
+
+    if embeddable:
+        embeddings = generate_embeddings_batch([prepared["normalized_log"] for prepared, _ in embeddable])
+        for (prepared, semantic_text), embedding in zip(embeddable, embeddings):
+            prepared["embedding"]     = embedding
+            prepared["semantic_text"] = semantic_text
+
+    return errors
+
+
+async def aembed_pending(prepared_logs: List[Dict[str, Any]]) -> None:
+    """
+    Async variant of _embed_pending for batch jobs — the batched Gemini
+    request goes through call_gemini, so it shares GEMINI_RATE, the
+    in-flight cap and the 429 retry with every other Gemini call. Logs with
+    empty embedding text stay unembedded; ingest_logs_bulk fails just those.
+    """
+    if any(prepared["embedding"] is None for prepared in prepared_logs):
+        await call_gemini(run_in_threadpool, _embed_pending, prepared_logs)
+
+
+def ingest_logs_bulk(prepared_logs: List[Dict[str, Any]]) -> List[tuple[str | None, HTTPException | None]]:
+    """
+    Stores many prepared logs (output of prepare_log) with one bulk INSERT,
+    then writes all stored logs to the Knowledge Graph in one transaction.
+    Logs prepared without an embedding (aprepare_log(embed=False)) are
+    embedded first, together, via generate_embeddings_batch — async callers
+    should await aembed_pending beforehand so the call is rate limited.
+
+    Args:
+        prepared_logs: List of prepare_log outputs
+
+    Returns:
+        List of (LOG_ID, error) tuples in input order — LOG_ID is None
+        and error is set for rows that failed (409 for duplicates, 500 for
+        a log with empty embedding text)
+
+    Raises:
+        HTTPException: If the bulk insert fails as a whole
+    """
+    try:
+        embed_errors    = _embed_pending(prepared_logs)
+        log_ids, errors = insert_logs_bulk([
+            prepared for i, prepared in enumerate(prepared_logs) if i not in embed_errors
+        ])
+    except Exception as e:
+        logger.error(f"Bulk ingestion failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Bulk ingestion failed: {str(e)}"
+        )
+
+    results = []
+    graphed = []
+
+    inserted = iter(enumerate(log_ids))   # offsets into the rows sent to insert_logs_bulk
+
+    for i, prepared in enumerate(prepared_logs):
+        if i in embed_errors:
+            results.append((None, embed_errors[i]))
+            continue
+
+        offset, log_id = next(inserted)
+        if log_id is None:
+            if errors[offset].code == ORA_UNIQUE_VIOLATION:
+                error = HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Duplicate log: This log has already been ingested"
+                )
+            else:
+                error = HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Ingestion failed: {errors[offset].message}"
+                )
+            results.append((None, error))
+            continue
+
+        graphed.append((prepared["normalized_log"], prepared["jira_id"]))
+        results.append((log_id, None))
+
+    # ── Knowledge Graph for every stored log — one transaction (non-fatal) ─────
+    add_logs_to_graph(graphed)
+
+    return results
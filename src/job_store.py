@@ -0,0 +1,135 @@
+"""
+job_store.py
+------------
+Background ingest job state for OIC-LogLens.
+
+Each job is a hash of counters/status fields plus a list of per-log results.
+With OLL_REDIS_URL set, jobs are kept in Redis (hash `job:{id}` and list
+`job:{id}:results`, both expiring after JOB_TTL_SECONDS) so a status poll can
+land on any uvicorn worker and jobs survive a restart. Without it, jobs are
+kept in process memory — fine for a single worker and local development.
+"""
+
+import orjson
+
+from config import logger, REDIS_URL, JOB_TTL_SECONDS
+
+# Hash fields that hold integers (Redis returns every field as a string).
+JOB_INT_FIELDS = ("total_logs", "processed", "successful", "duplicates", "failed")
+
+
+def _new_job(total: int | None) -> dict:
+    return {
+        "status":      "pending",
+        "total_logs":  total,
+        "processed":   0,
+        "successful":  0,
+        "duplicates":  0,
+        "failed":      0,
+        "current_log": None,
+        "error":       None
+    }
+
+
+# ── IN-MEMORY STORE ────────────────────────────────────────────────────────────
+
+class _MemoryJobStore:
+    """Process-local job store. Jobs are visible to this worker only."""
+
+    def __init__(self):
+        self._jobs = {}
+
+    async def create(self, job_id: str, total: int | None = None) -> None:
+        self._jobs[job_id] = {**_new_job(total), "results": []}
+
+    async def update(self, job_id: str, **fields) -> None:
+        self._jobs[job_id].update(fields)
+
+    async def incr(self, job_id: str, field: str, amount: int = 1) -> None:
+        self._jobs[job_id][field] += amount
+
+    async def add_result(self, job_id: str, counter: str, result: dict) -> None:
+        job = self._jobs[job_id]
+        job[counter] += 1
+        job["results"].append(result)
+
+    async def get(self, job_id: str) -> dict | None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        return {**job, "results": sorted(job["results"], key=lambda r: r["log_index"])}
+
+    async def close(self) -> None:
+        pass
+
+
+# ── REDIS STORE ────────────────────────────────────────────────────────────────
+
+class _RedisJobStore:
+    """Redis-backed job store shared by every worker process."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis   # only needed when OLL_REDIS_URL is set
+
+        self._redis = redis.from_url(url, decode_responses=True)
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"job:{job_id}"
+
+    @staticmethod
+    def _encode(fields: dict) -> dict:
+        # Redis hashes cannot hold None — store "" and map it back in get()
+        return {k: "" if v is None else v for k, v in fields.items()}
+
+    async def create(self, job_id: str, total: int | None = None) -> None:
+        key = self._key(job_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=self._encode(_new_job(total)))
+            pipe.expire(key, JOB_TTL_SECONDS)
+            await pipe.execute()
+
+    async def update(self, job_id: str, **fields) -> None:
+        await self._redis.hset(self._key(job_id), mapping=self._encode(fields))
+
+    async def incr(self, job_id: str, field: str, amount: int = 1) -> None:
+        await self._redis.hincrby(self._key(job_id), field, amount)
+
+    async def add_result(self, job_id: str, counter: str, result: dict) -> None:
+        key = self._key(job_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(key, counter, 1)
+            pipe.rpush(f"{key}:results", orjson.dumps(result))
+            pipe.expire(f"{key}:results", JOB_TTL_SECONDS)
+            await pipe.execute()
+
+    async def get(self, job_id: str) -> dict | None:
+        key = self._key(job_id)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(key)
+            pipe.lrange(f"{key}:results", 0, -1)
+            fields, results = await pipe.execute()
+
+        if not fields:
+            return None
+
+        job = {k: v or None for k, v in fields.items()}
+        for field in (*JOB_INT_FIELDS, "current_log"):
+            if job[field] is not None:
+                job[field] = int(job[field])
+
+        job["results"] = sorted((orjson.loads(r) for r in results), key=lambda r: r["log_index"])
+        return job
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+# ── STORE ──────────────────────────────────────────────────────────────────────
+
+if REDIS_URL:
+    logger.info("Job store: Redis")
+    jobs = _RedisJobStore(REDIS_URL)
+else:
+    logger.info("Job store: in-memory (set OLL_REDIS_URL to share jobs across workers)")
+    jobs = _MemoryJobStore()
@@ -4,7 +4,7 @@
 -- Tables   : OIC_KB_GRAPH_NODES, OIC_KB_GRAPH_EDGES
 -- Graph    : OIC_KB_GRAPH
 -- User     : EA_APP | DB: FREEPDB1
--- Version  : 1.2
+-- Version  : 1.3
 -- ============================================================
 -- NOTE: Run this AFTER oic_kb_schema.sql
 --       Safe to re-run — drops in correct order before recreating.
@@ -88,6 +88,11 @@ ALTER TABLE OIC_KB_GRAPH_EDGES
     ADD CONSTRAINT OIC_KB_EDGES_TO_FK
     FOREIGN KEY (TO_NODE) REFERENCES OIC_KB_GRAPH_NODES(NODE_ID);
 
+-- One edge per (from, to, type) — backs the idempotent MERGE in graph_service
+ALTER TABLE OIC_KB_GRAPH_EDGES
+    ADD CONSTRAINT OIC_KB_EDGES_UQ
+    UNIQUE (FROM_NODE, TO_NODE, EDGE_TYPE);
+
 COMMENT ON TABLE OIC_KB_GRAPH_EDGES IS
     'OIC Knowledge Base: Stores directional relationships between graph entities.';
 
@@ -5,21 +5,23 @@ FastAPI REST API for OIC-LogLens.
 Provides endpoints for log ingestion and deduplication search.
 """
 
-import time
 import uuid
-from typing import Dict
 
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI, BackgroundTasks, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from models import (IngestFileRequest, IngestURLRequest, IngestRawRequest,
                      IngestDatabaseRequest, IngestResponse, BatchIngestResponse,
                      BatchJobAccepted, BatchJobStatus,
                      SearchRequest, SearchResponse)
 from ingestion_service import (load_from_file, load_from_url, load_from_raw_text, 
-                                     load_from_database, ingest_log)
+                                     check_database_query, aingest_log)
 from search_service import search_log
-from config import logger
+from job_store import jobs
+from workers import process_batch
+from config import logger, REDIS_URL
 
 # ── FastAPI App ────────────────────────────────────────────────────────────────
 
@@ -28,14 +30,12 @@ app = FastAPI(
     description="AI-Powered Error Resolution Engine for Oracle Integration Cloud",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse   # orjson serializes search matches far faster than stdlib json
 )
 
-# ── In-Memory Job Store ───────────────────────────────────────────────────────
-# Stores background job state keyed by job_id.
-# In production this should be replaced with a persistent store (Redis, DB).
-
-_jobs: Dict[str, dict] = {}
+# arq connection used to enqueue batch jobs — set on startup when OLL_REDIS_URL is set
+_arq_pool = None
 
 
 # ── CORS Middleware ────────────────────────────────────────────────────────────
@@ -65,7 +65,7 @@ def health_check():
     tags=["Ingestion"],
     summary="Ingest log from file path"
 )
-def ingest_file(request: IngestFileRequest):
+async def ingest_file(request: IngestFileRequest):
     """
     Ingest an OIC log from a file path on the server.
     
@@ -77,11 +77,11 @@ def ingest_file(request: IngestFileRequest):
     
     Returns the LOG_ID of the ingested record.
     """
-    # Load raw log from file
-    raw_log = load_from_file(request.file_path)
+    # Load raw log from file (blocking I/O — keep it off the event loop)
+    raw_log = await run_in_threadpool(load_from_file, request.file_path)
     
     # Run ingestion pipeline
-    log_id, jira_id = ingest_log(raw_log)
+    log_id, jira_id = await aingest_log(raw_log)
     
     return IngestResponse(
         log_id=log_id,
@@ -98,18 +98,18 @@ def ingest_file(request: IngestFileRequest):
     tags=["Ingestion"],
     summary="Ingest log from URL"
 )
-def ingest_url(request: IngestURLRequest):
+async def ingest_url(request: IngestURLRequest):
     """
     Ingest an OIC log from a URL.
     
     Fetches the log file from the provided HTTP/HTTPS URL,
     then runs the standard ingestion pipeline.
     """
-    # Load raw log from URL
-    raw_log = load_from_url(request.url)
+    # Load raw log from URL (blocking I/O — keep it off the event loop)
+    raw_log = await run_in_threadpool(load_from_url, request.url)
     
     # Run ingestion pipeline
-    log_id, jira_id = ingest_log(raw_log)
+    log_id, jira_id = await aingest_log(raw_log)
     
     return IngestResponse(
         log_id=log_id,
@@ -125,7 +125,7 @@ def ingest_url(request: IngestURLRequest):
     tags=["Ingestion"],
     summary="Ingest log from raw text"
 )
-def ingest_raw(request: IngestRawRequest):
+async def ingest_raw(request: IngestRawRequest):
     """
     Ingest an OIC log from raw JSON text.
     
@@ -136,7 +136,7 @@ def ingest_raw(request: IngestRawRequest):
     raw_log = load_from_raw_text(request.log_content)
     
     # Run ingestion pipeline
-    log_id, jira_id = ingest_log(raw_log)
+    log_id, jira_id = await aingest_log(raw_log)
     
     return IngestResponse(
         log_id=log_id,
@@ -146,13 +146,40 @@ def ingest_raw(request: IngestRawRequest):
     )
 
 
+@app.post(
+    "/ingest/upload",
+    response_model=IngestResponse,
+    tags=["Ingestion"],
+    summary="Ingest log from an uploaded file body"
+)
+async def ingest_upload(request: Request):
+    """
+    Ingest an OIC log sent as the raw request body (application/octet-stream).
+
+    Lets clients stream a file straight through instead of wrapping it
+    in a JSON string, then runs the standard ingestion pipeline.
+    """
+    # Load raw log from request body
+    raw_log = load_from_raw_text(await request.body())
+
+    # Run ingestion pipeline
+    log_id, jira_id = await aingest_log(raw_log)
+
+    return IngestResponse(
+        log_id=log_id,
+        jira_id=jira_id,
+        status="success",
+        message="Log ingested successfully"
+    )
+
+
 @app.post(
     "/ingest/database",
     response_model=BatchJobAccepted,
     tags=["Ingestion"],
     summary="Ingest logs from database (background batch)"
 )
-def ingest_database(request: IngestDatabaseRequest, background_tasks: BackgroundTasks):
+async def ingest_database(request: IngestDatabaseRequest, background_tasks: BackgroundTasks):
     """
     Ingest OIC logs from a database query — runs in the background.
 
@@ -167,115 +194,31 @@ def ingest_database(request: IngestDatabaseRequest, background_tasks: Background
     """
     from fastapi import HTTPException
 
-    # Load raw logs from database upfront (fast — no LLM calls)
-    raw_logs = load_from_database(request.connection_string, request.query)
-    total = len(raw_logs)
+    # Validate the query up front — logs are streamed (and counted) while the job runs
+    await run_in_threadpool(check_database_query, request.connection_string, request.query)
 
     # Create job entry
     job_id = str(uuid.uuid4())
-    _jobs[job_id] = {
-        "status":      "pending",
-        "total_logs":  total,
-        "processed":   0,
-        "successful":  0,
-        "duplicates":  0,
-        "failed":      0,
-        "current_log": None,
-        "results":     [],
-        "error":       None
-    }
-
-    logger.info(f"Job {job_id} created | {total} logs queued")
+    await jobs.create(job_id)
+
+    logger.info(f"Job {job_id} created | query queued")
 
     # Queue background processing
-    background_tasks.add_task(_process_batch, job_id, raw_logs)
+    if _arq_pool is not None:
+        # Run on an arq worker — survives API restarts and resumes from its results
+        await _arq_pool.enqueue_job("process_batch_task", job_id, request.connection_string, request.query,
+                                    _job_id=job_id)
+    else:
+        background_tasks.add_task(process_batch, job_id, request.connection_string, request.query)
 
     return BatchJobAccepted(
         job_id=job_id,
         status="accepted",
-        message=f"{total} logs queued for background processing",
-        total_logs=total
+        message="Query queued for background processing",
+        total_logs=None
     )
 
 
-def _process_batch(job_id: str, raw_logs: list):
-    """
-    Background task — processes each log sequentially with sleep between calls.
-    Updates _jobs[job_id] in place so the status endpoint can poll it.
-    """
-    from fastapi import HTTPException
-
-    BATCH_SLEEP_SECONDS = 15  # gap between logs to avoid LLM rate limits
-
-    job = _jobs[job_id]
-    job["status"] = "in_progress"
-    total = len(raw_logs)
-
-    for i, raw_log in enumerate(raw_logs, 1):
-        job["current_log"] = i
-        logger.info(f"Job {job_id} | Processing log {i}/{total}")
-
-        try:
-            log_id, jira_id = ingest_log(raw_log)
-
-            job["results"].append({
-                "log_index": i,
-                "log_id":    log_id,
-                "jira_id":   jira_id,
-                "status":    "success",
-                "message":   f"Log {i} ingested successfully"
-            })
-            job["successful"] += 1
-
-        except HTTPException as e:
-            if e.status_code == 409:
-                job["duplicates"] += 1
-                job["results"].append({
-                    "log_index": i,
-                    "log_id":    "",
-                    "jira_id":   "",
-                    "status":    "duplicate",
-                    "message":   f"Log {i}: Duplicate detected"
-                })
-            else:
-                job["failed"] += 1
-                job["results"].append({
-                    "log_index": i,
-                    "log_id":    "",
-                    "jira_id":   "",
-                    "status":    "error",
-                    "message":   f"Log {i}: {e.detail}"
-                })
-
-        except Exception as e:
-            job["failed"] += 1
-            job["results"].append({
-                "log_index": i,
-                "log_id":    "",
-                "jira_id":   "",
-                "status":    "error",
-                "message":   f"Log {i}: {str(e)}"
-            })
-
-        job["processed"] = i
-
-        # Sleep between logs — skip after last
-        if i < total:
-            logger.info(f"Job {job_id} | Sleeping {BATCH_SLEEP_SECONDS}s (rate limit buffer)...")
-            time.sleep(BATCH_SLEEP_SECONDS)
-
-    # Mark job complete
-    if job["failed"] == 0 and job["duplicates"] == 0:
-        job["status"] = "completed"
-    elif job["successful"] > 0:
-        job["status"] = "completed"
-    else:
-        job["status"] = "failed"
-
-    job["current_log"] = None
-    logger.info(f"Job {job_id} | Done | success={job['successful']} duplicates={job['duplicates']} failed={job['failed']}")
-
-
 # ── Job Status Endpoint ────────────────────────────────────────────────────────
 
 @app.get(
@@ -284,7 +227,7 @@ def _process_batch(job_id: str, raw_logs: list):
     tags=["Ingestion"],
     summary="Poll background ingest job status"
 )
-def get_ingest_status(job_id: str):
+async def get_ingest_status(job_id: str):
     """
     Poll the status of a background database ingest job.
 
@@ -296,14 +239,13 @@ def get_ingest_status(job_id: str):
     """
     from fastapi import HTTPException, status as http_status
 
-    if job_id not in _jobs:
+    job = await jobs.get(job_id)
+    if job is None:
         raise HTTPException(
             status_code=http_status.HTTP_404_NOT_FOUND,
             detail=f"Job {job_id} not found"
         )
 
-    job = _jobs[job_id]
-
     return BatchJobStatus(
         job_id=job_id,
         status=job["status"],
@@ -326,7 +268,7 @@ def get_ingest_status(job_id: str):
     tags=["Search"],
     summary="Search for duplicate/similar logs"
 )
-def search_duplicate(request: SearchRequest):
+async def search_duplicate(request: SearchRequest):
     """
     Search for duplicate or similar logs using semantic similarity.
     
@@ -341,8 +283,8 @@ def search_duplicate(request: SearchRequest):
     # Load raw log from text
     raw_log = load_from_raw_text(request.log_content)
     
-    # Run search pipeline
-    matches = search_log(raw_log, top_n=5)
+    # Run search pipeline (blocking — keep it off the event loop)
+    matches = await run_in_threadpool(search_log, raw_log, top_n=5)
     
     return SearchResponse(
         status="success",
@@ -386,13 +328,31 @@ def clear_caches():
     return {"status": "success", "message": "All caches cleared"}
 
 
-# ── SHUTDOWN HANDLER ───────────────────────────────────────────────────────────
+# ── STARTUP / SHUTDOWN HANDLERS ────────────────────────────────────────────────
+
+@app.on_event("startup")
+async def startup_event():
+    """Seed the LOG_HASH duplicate filter and connect to the batch job queue"""
+    global _arq_pool
+    from db import load_hash_filter
+    await run_in_threadpool(load_hash_filter)
+
+    if REDIS_URL:
+        from arq import create_pool
+        from workers import REDIS_SETTINGS
+        _arq_pool = await create_pool(REDIS_SETTINGS)
+
 
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
     """Clean up resources on shutdown"""
     from db import close_connection_pool
+    from ingestion_service import close_source_pools
     close_connection_pool()
+    close_source_pools()
+    await jobs.close()
+    if _arq_pool is not None:
+        await _arq_pool.aclose()
 
 if __name__ == "__main__":
     import uvicorn
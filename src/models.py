@@ -173,15 +173,15 @@ class BatchJobAccepted(BaseModel):
     job_id: str = Field(..., description="Unique job ID to poll for status")
     status: str = Field(default="accepted", description="Always 'accepted'")
     message: str = Field(..., description="Human readable message")
-    total_logs: int = Field(..., description="Total logs queued for processing")
+    total_logs: Optional[int] = Field(None, description="Total logs queued (null — counted while the job streams them)")
 
     class Config:
         json_schema_extra = {
             "example": {
                 "job_id": "a1b2c3d4-e5f6-7890-abcd-ef1234567890",
                 "status": "accepted",
-                "message": "16 logs queued for background processing",
-                "total_logs": 16
+                "message": "Query queued for background processing",
+                "total_logs": None
             }
         }
 
@@ -190,7 +190,7 @@ class BatchJobStatus(BaseModel):
     """Response model for GET /ingest/status/{job_id}"""
     job_id: str = Field(..., description="Job ID")
     status: str = Field(..., description="pending | in_progress | completed | failed")
-    total_logs: int = Field(..., description="Total logs to process")
+    total_logs: Optional[int] = Field(None, description="Total logs to process (null until the source query has been read to the end)")
     processed: int = Field(..., description="Logs processed so far")
     successful: int = Field(..., description="Successfully ingested")
     duplicates: int = Field(..., description="Duplicates skipped")
@@ -4,21 +4,513 @@ normalizer.py
 Normalization module for OIC-LogLens.
 Sends a raw OIC log to Gemini and returns a normalized JSON object
 matching the output contract defined in prompts.py.
+
+Structurally identical logs (same workflow, same failure) are served from a
+persistent template cache keyed by a fingerprint of the raw log with its
+volatile values (ids, timestamps, tracking values) masked out. On a hit the
+log's own timestamp, user and tracking values are written back into a copy
+of the template.
 """
 
+import io
+import re
+import copy
 import json
-import logging
-from google import genai
-from prompts import get_normalization_prompt
+import asyncio
+import time
+import sqlite3
+import hashlib
+import orjson
+import threading
+from datetime import datetime, timezone
+from google.genai import types
+from prompts import NORMALIZATION_PREFIX, get_normalization_prompt, get_normalization_log_part
+
+from gemini_rate import call_gemini
+from config import client, async_client, logger, GENERATION_MODEL, TEMPLATE_CACHE_PATH
+
+# ── TEMPLATE CACHE ─────────────────────────────────────────────────────────────
+
+VOLATILE_MASK = "<*>"
+
+# Keys whose values change on every run of the same workflow.
+VOLATILE_KEYS = {
+    "eventId",
+    "parentEventId",
+    "automationInstanceId",
+    "ociRequestId",
+    "flowEventCreationDate",
+}
+
+VOLATILE_PATTERNS = [
+    re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:?\d{2})?"),     # ISO 8601
+    re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"),  # UUID
+    re.compile(r"\b1\d{12}\b"),                                                          # epoch ms
+    re.compile(r"_Oo_\w+_Oo_\s*\S*"),                                                     # tracking wrapper
+]
+
+CREATE_TEMPLATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS normalize_template (
+    fingerprint   TEXT PRIMARY KEY,
+    template_json TEXT NOT NULL,
+    ref_log       TEXT NOT NULL,
+    hits          INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+def _canonicalize(value):
+    """
+    Recursively replaces volatile values in a parsed raw log with VOLATILE_MASK.
+
+    Args:
+        value: Any JSON value (dict, list, str, number, bool, None).
+
+    Returns:
+        The same structure with volatile values masked.
+    """
+    if isinstance(value, dict):
+        return {
+            k: VOLATILE_MASK if k in VOLATILE_KEYS else _canonicalize(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_canonicalize(v) for v in value]
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and 10**12 <= value < 2 * 10**12:
+        return VOLATILE_MASK
+    if isinstance(value, str):
+        for pattern in VOLATILE_PATTERNS:
+            value = pattern.sub(VOLATILE_MASK, value)
+    return value
+
+
+def canonicalize(raw_log: list | str | bytes) -> str:
+    """
+    Builds the canonical string form of a raw log used for fingerprinting.
+
+    Args:
+        raw_log: Raw OIC log as a Python list or a JSON string.
+
+    Returns:
+        Compact, key-sorted JSON string with volatile values masked.
+    """
+    if isinstance(raw_log, (str, bytes)):
+        try:
+            raw_log = orjson.loads(raw_log)
+        except orjson.JSONDecodeError:
+            text = raw_log.decode() if isinstance(raw_log, bytes) else raw_log
+            return _canonicalize(text)
+    return orjson.dumps(_canonicalize(raw_log), option=orjson.OPT_SORT_KEYS).decode()
+
+
+class _TemplateCache:
+    """
+    SQLite-backed cache of normalized logs keyed by raw-log fingerprint.
+    The canonical reference log is stored alongside each template and compared
+    on lookup so a fingerprint collision can never return a wrong template.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self._path, check_same_thread=False)
+            self._conn.execute(CREATE_TEMPLATE_TABLE_SQL)
+            self._conn.commit()
+        return self._conn
+
+    def get(self, fingerprint: str, ref_log: str) -> dict | None:
+        with self._lock:
+            conn = self._connect()
+            row  = conn.execute(
+                "SELECT template_json, ref_log FROM normalize_template WHERE fingerprint = ?",
+                (fingerprint,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            template_json, cached_ref = row
+            if cached_ref != ref_log:
+                logger.warning("Template cache fingerprint collision: %s", fingerprint)
+                return None
+
+            conn.execute(
+                "UPDATE normalize_template SET hits = hits + 1 WHERE fingerprint = ?",
+                (fingerprint,)
+            )
+            conn.commit()
+            return orjson.loads(template_json)
+
+    def put(self, fingerprint: str, ref_log: str, normalized: dict) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO normalize_template (fingerprint, template_json, ref_log, hits) "
+                "VALUES (?, ?, ?, 0)",
+                (fingerprint, orjson.dumps(normalized).decode(), ref_log)
+            )
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, hits = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM normalize_template"
+            ).fetchone()
+        return {"templates": entries, "hits": hits}
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM normalize_template")
+            conn.commit()
+
+
+_template_cache = _TemplateCache(TEMPLATE_CACHE_PATH)
+
+
+def get_template_cache_stats() -> dict:
+    """Returns template count and lifetime hit count for the template cache."""
+    return _template_cache.stats()
+
+
+def clear_template_cache() -> None:
+    """Removes every cached normalization template."""
+    _template_cache.clear()
+
+
+# ── PROMPT PREFIX CACHE ────────────────────────────────────────────────────────
+# The schema + rules head of the normalization prompt is identical for every
+# log. It is registered once as a Gemini context cache and referenced by name,
+# so only the raw log is sent and processed per call.
+
+PREFIX_CACHE_DISPLAY_NAME   = "oic-norm-prefix"
+PREFIX_CACHE_TTL_SECONDS    = 3600
+PREFIX_CACHE_REFRESH_MARGIN = 300   # extend TTL this many seconds before expiry
+
+
+class _PrefixCache:
+    """
+    Lazily creates the Gemini context cache for NORMALIZATION_PREFIX and keeps
+    its TTL extended. If the cache cannot be created (e.g. the prefix is below
+    the model's minimum cacheable size) it disables itself and callers fall
+    back to sending the full prompt. name() serves sync callers; aname()
+    serves the event loop and awaits the cache calls on the async client.
+    """
+
+    def __init__(self):
+        self._lock     = threading.Lock()
+        self._alock    = asyncio.Lock()
+        self._name     = None
+        self._expires  = 0.0
+        self._disabled = False
+
+    def _fresh(self) -> bool:
+        return bool(self._name) and time.time() < self._expires - PREFIX_CACHE_REFRESH_MARGIN
+
+    def _create_config(self, ttl: str) -> types.CreateCachedContentConfig:
+        return types.CreateCachedContentConfig(
+            contents=[NORMALIZATION_PREFIX],
+            ttl=ttl,
+            display_name=PREFIX_CACHE_DISPLAY_NAME
+        )
+
+    def _failed(self, e: Exception) -> None:
+        if self._name:
+            # Cache may have expired server-side — recreate on next call
+            logger.warning("Prompt prefix cache refresh failed, recreating: %s", e)
+            self._name = None
+            self._expires = 0.0
+            return
+        logger.warning("Prompt prefix cache unavailable, sending full prompts: %s", e)
+        self._disabled = True
+
+    def name(self) -> str | None:
+        if self._disabled:
+            return None
+
+        with self._lock:
+            if self._disabled or self._fresh():
+                return self._name
+
+            now = time.time()
+            ttl = f"{PREFIX_CACHE_TTL_SECONDS}s"
+            try:
+                if self._name:
+                    client.caches.update(
+                        name=self._name,
+                        config=types.UpdateCachedContentConfig(ttl=ttl)
+                    )
+                    logger.info("Prompt prefix cache TTL extended: %s", self._name)
+                else:
+                    cached = client.caches.create(model=GENERATION_MODEL, config=self._create_config(ttl))
+                    self._name = cached.name
+                    logger.info("Prompt prefix cache created: %s", self._name)
+            except Exception as e:
+                self._failed(e)
+                return None
+
+            self._expires = now + PREFIX_CACHE_TTL_SECONDS
+            return self._name
+
+    async def aname(self) -> str | None:
+        if self._disabled:
+            return None
+        if self._fresh():
+            return self._name
+
+        async with self._alock:
+            if self._disabled or self._fresh():
+                return self._name
+
+            now = time.time()
+            ttl = f"{PREFIX_CACHE_TTL_SECONDS}s"
+            try:
+                if self._name:
+                    await async_client.caches.update(
+                        name=self._name,
+                        config=types.UpdateCachedContentConfig(ttl=ttl)
+                    )
+                    logger.info("Prompt prefix cache TTL extended: %s", self._name)
+                else:
+                    cached = await async_client.caches.create(model=GENERATION_MODEL, config=self._create_config(ttl))
+                    self._name = cached.name
+                    logger.info("Prompt prefix cache created: %s", self._name)
+            except Exception as e:
+                self._failed(e)
+                return None
+
+            self._expires = now + PREFIX_CACHE_TTL_SECONDS
+            return self._name
+
+
+_prefix_cache = _PrefixCache()
+
+
+# ── HELPERS ────────────────────────────────────────────────────────────────────
+
+# ```json ... ``` (or bare ```) wrapper around an LLM response
+_FENCE_RE = re.compile(r"^\s*```(?:json)?[^\S\n]*\n(.*?)\n\s*```\s*$", re.S)
+
+
+def _fingerprint(raw_log: list | str | bytes) -> tuple[str, str]:
+    """
+    Computes the template-cache fingerprint of a raw log.
+
+    Args:
+        raw_log: Raw OIC log as a Python list (JSON array) or JSON text (str/bytes).
+
+    Returns:
+        Tuple of (fingerprint, canonical reference log).
+    """
+    ref_log     = canonicalize(raw_log)
+    fingerprint = hashlib.blake2b(ref_log.encode(), digest_size=16).hexdigest()
+    return fingerprint, ref_log
+
+
+# _Oo_VarName_Oo_ wrapper in front of a tracking variable value
+_TRACKING_WRAPPER_RE = re.compile(r"^_Oo_\w+_Oo_\s*")
+
+
+def _apply_volatile(normalized: dict, raw_log: list | str | bytes) -> dict:
+    """
+    Copies a cached template and overwrites the fields masked out of the
+    fingerprint (flow.timestamp, user.id, tracking_variables) with the values
+    from this raw log, so a template hit never carries another log's values.
+
+    Args:
+        normalized: Cached normalized log for the log's fingerprint.
+        raw_log:    Raw OIC log as a Python list (JSON array) or JSON text (str/bytes).
+
+    Returns:
+        A new normalized log dict.
+    """
+    normalized = copy.deepcopy(normalized)
+    if isinstance(raw_log, (str, bytes)):
+        try:
+            raw_log = orjson.loads(raw_log)
+        except orjson.JSONDecodeError:
+            return normalized
+    if not isinstance(raw_log, list):
+        return normalized
+
+    events = [e for e in raw_log if isinstance(e, dict)]
+    root   = next((e for e in events if e.get("automationRoot")), None) \
+          or next((e for e in events if "flowCode" in e), None)
+
+    if root is not None:
+        if isinstance(normalized.get("flow"), dict):
+            created = root.get("flowEventCreationDate")
+            normalized["flow"]["timestamp"] = (
+                datetime.fromtimestamp(created / 1000, tz=timezone.utc).isoformat(timespec="milliseconds")
+                if isinstance(created, (int, float)) else None
+            )
+        if isinstance(normalized.get("user"), dict):
+            normalized["user"]["id"] = root.get("userId")
+
+    variables = next((e["variables"] for e in events if isinstance(e.get("variables"), list)), None)
+    if variables is not None and isinstance(normalized.get("tracking_variables"), dict):
+        primary   = {"name": None, "value": None}
+        secondary = []
+        for var in variables:
+            if not isinstance(var, dict):
+                continue
+            if "trackingPkVarName" in var:
+                primary = {
+                    "name":  var["trackingPkVarName"],
+                    "value": _TRACKING_WRAPPER_RE.sub("", str(var.get("main_pkVarValue", "")))
+                }
+            elif "trackingVarName" in var:
+                secondary.append({
+                    "name":  var["trackingVarName"],
+                    "value": _TRACKING_WRAPPER_RE.sub("", str(var.get("main_tVarValue", "")))
+                })
+        normalized["tracking_variables"] = {"primary_key": primary, "secondary": secondary}
+
+    return normalized
+
+
+def _build_request(raw_log: list | str | bytes, cache_name: str | None) -> tuple[str, types.GenerateContentConfig]:
+    """
+    Serializes the raw log (if needed) and builds the normalization request.
+    JSON output mode is always requested so the model emits no code fences.
+    When the prompt prefix is context-cached only the raw-log part is sent.
 
-from config import client, logger, GENERATION_MODEL
+    Args:
+        raw_log:    Raw OIC log as a Python list (JSON array) or JSON text (str/bytes).
+        cache_name: Prompt prefix context cache name (_prefix_cache), or None.
+
+    Returns:
+        Tuple of (contents, generation config).
+    """
+    if isinstance(raw_log, list):
+        raw_log_str = orjson.dumps(raw_log).decode()   # compact — no indent tokens
+    elif isinstance(raw_log, bytes):
+        raw_log_str = raw_log.decode()
+    else:
+        raw_log_str = raw_log       # already JSON text — sent as-is
+
+    logger.info("Building normalization prompt ...")
+
+    config = types.GenerateContentConfig(
+        response_mime_type="application/json",
+        cached_content=cache_name
+    )
+
+    if cache_name:
+        return get_normalization_log_part(raw_log_str), config
+
+    return get_normalization_prompt(raw_log_str), config
 
-def normalize_log(raw_log: list | str) -> dict:
+
+def _parse_response(raw_response: str) -> dict:
+    """
+    Strips optional markdown code fences and parses the LLM response as JSON.
+    Fences are not expected in JSON output mode but are still tolerated
+    (e.g. Batch Mode results).
+
+    Args:
+        raw_response: Text returned by Gemini.
+
+    Returns:
+        Normalized log as a Python dict.
+
+    Raises:
+        ValueError: If the response cannot be parsed as valid JSON.
+    """
+    match = _FENCE_RE.match(raw_response)
+    raw_response = match.group(1) if match else raw_response.strip()
+
+    try:
+        normalized = orjson.loads(raw_response)
+        logger.info("Normalization successful.")
+        return normalized
+    except (orjson.JSONDecodeError, json.JSONDecodeError) as e:
+        logger.error("Failed to parse LLM response as JSON: %s", e)
+        logger.error("Raw response was:\n%s", raw_response)
+        raise ValueError(f"LLM did not return valid JSON: {e}") from e
+
+
+# ── NORMALIZER ─────────────────────────────────────────────────────────────────
+
+def _lookup_template(raw_log: list | str | bytes) -> tuple[str, str, dict | None]:
+    """
+    Fingerprints a raw log and looks it up in the template cache. Blocking
+    (canonicalize + SQLite) — the async path runs it in a worker thread.
+
+    Returns:
+        Tuple of (fingerprint, canonical reference log, normalized log with
+        this log's volatile values — or None on a miss).
+    """
+    fingerprint, ref_log = _fingerprint(raw_log)
+
+    cached = _template_cache.get(fingerprint, ref_log)
+    if cached is None:
+        return fingerprint, ref_log, None
+
+    logger.info("Template cache hit (%s) — skipping Gemini call.", fingerprint)
+    return fingerprint, ref_log, _apply_volatile(cached, raw_log)
+
+
+def normalize_log_stream(raw_log: list | str | bytes):
+    """
+    Streams the normalized JSON text for a raw OIC log as Gemini generates it,
+    so downstream consumers can start work before the last token arrives.
+    A template-cache hit is yielded as a single chunk.
+
+    Args:
+        raw_log: Raw OIC log as a Python list (JSON array) or JSON text (str/bytes).
+
+    Yields:
+        Chunks of the normalized JSON text.
+
+    Returns:
+        The parsed normalized log dict (as the generator's return value).
+
+    Raises:
+        ValueError: If the LLM response cannot be parsed as valid JSON.
+        Exception:  If the Gemini API call fails.
+    """
+    fingerprint, ref_log, normalized = _lookup_template(raw_log)
+    if normalized is not None:
+        yield orjson.dumps(normalized).decode()
+        return normalized
+
+    contents, config = _build_request(raw_log, _prefix_cache.name())
+
+    logger.info("Streaming log to Gemini (%s) for normalization ...", GENERATION_MODEL)
+
+    buf = io.StringIO()
+    for chunk in client.models.generate_content_stream(
+        model=GENERATION_MODEL,
+        contents=contents,
+        config=config
+    ):
+        text = chunk.text
+        if text:
+            buf.write(text)
+            yield text
+
+    logger.info("Response received from Gemini.")
+
+    normalized = _parse_response(buf.getvalue())
+    _template_cache.put(fingerprint, ref_log, normalized)
+    return normalized
+
+
+def normalize_log(raw_log: list | str | bytes) -> dict:
     """
     Normalizes a raw OIC log using Gemini LLM.
+    Returns the cached template instead when a structurally identical log
+    has already been normalized.
 
     Args:
-        raw_log: Raw OIC log as a Python list (JSON array) or a JSON string.
+        raw_log: Raw OIC log as a Python list (JSON array) or JSON text (str/bytes).
 
     Returns:
         Normalized log as a Python dict matching the output contract.
@@ -27,41 +519,80 @@ def normalize_log(raw_log: list | str) -> dict:
         ValueError: If the LLM response cannot be parsed as valid JSON.
         Exception:  If the Gemini API call fails.
     """
+    stream = normalize_log_stream(raw_log)
+    try:
+        while True:
+            next(stream)
+    except StopIteration as done:
+        return done.value
 
-    if isinstance(raw_log, list):
-        raw_log_str = json.dumps(raw_log, indent=2)
-    else:
-        raw_log_str = raw_log
 
-    logger.info("Building normalization prompt ...")
+# Gemini calls currently in flight, keyed by (fingerprint, ref_log). Concurrent
+# callers for a structurally identical log await the same call instead of each
+# missing the template cache and sending their own request.
+_in_flight: dict[tuple[str, str], asyncio.Task] = {}
 
-    prompt = get_normalization_prompt(raw_log_str)
 
-    logger.info(f"Sending log to Gemini ({GENERATION_MODEL}) for normalization ...")
+async def _anormalize_uncached(raw_log: list | str | bytes, fingerprint: str, ref_log: str) -> dict:
+    contents, config = _build_request(raw_log, await _prefix_cache.aname())
 
-    response = client.models.generate_content(
+    logger.info("Sending log to Gemini (%s) for normalization (async) ...", GENERATION_MODEL)
+
+    response = await call_gemini(
+        async_client.models.generate_content,
         model=GENERATION_MODEL,
-        contents=prompt
+        contents=contents,
+        config=config
     )
-
-    raw_response = response.text.strip()
     logger.info("Response received from Gemini.")
 
-    if raw_response.startswith("```"):
-        lines = raw_response.splitlines()
-        # Remove first line (```json or ```) and last line (```)
-        lines = lines[1:] if lines[0].startswith("```") else lines
-        lines = lines[:-1] if lines[-1].strip() == "```" else lines
-        raw_response = "\n".join(lines).strip()
+    normalized = _parse_response(response.text)
+    await asyncio.to_thread(_template_cache.put, fingerprint, ref_log, normalized)
+    return normalized
 
-    try:
-        normalized = json.loads(raw_response)
-        logger.info("Normalization successful.")
+
+async def anormalize_log(raw_log: list | str | bytes) -> dict:
+    """
+    Async variant of normalize_log — awaits Gemini on the shared async client
+    so many logs can be normalized concurrently. Concurrent calls for
+    structurally identical logs share a single Gemini request, and only
+    that request is rate limited (call_gemini) — cache hits are not.
+
+    Args:
+        raw_log: Raw OIC log as a Python list (JSON array) or JSON text (str/bytes).
+
+    Returns:
+        Normalized log as a Python dict matching the output contract.
+
+    Raises:
+        ValueError: If the LLM response cannot be parsed as valid JSON.
+        Exception:  If the Gemini API call fails.
+    """
+    # fingerprint + SQLite lookup (and the hit counter commit) stay off the event loop
+    fingerprint, ref_log, normalized = await asyncio.to_thread(_lookup_template, raw_log)
+    if normalized is not None:
         return normalized
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse LLM response as JSON: {e}")
-        logger.error(f"Raw response was:\n{raw_response}")
-        raise ValueError(f"LLM did not return valid JSON: {e}") from e
+
+    key  = (fingerprint, ref_log)
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_anormalize_uncached(raw_log, fingerprint, ref_log))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    else:
+        logger.info("Joining in-flight normalization (%s) — skipping Gemini call.", fingerprint)
+
+    # shield: one cancelled caller must not cancel the call the others await
+    normalized = await asyncio.shield(task)
+    return _apply_volatile(normalized, raw_log)   # joiners share the template, not its values
+
+
+def _read_log_file(file_path: str) -> bytes:
+    # Raw JSON text goes straight into the prompt — no parse + re-serialize.
+    logger.info("Reading log file: %s", file_path)
+
+    with open(file_path, "rb") as f:
+        return f.read()
 
 
 def normalize_log_from_file(file_path: str) -> dict:
@@ -74,9 +605,17 @@ def normalize_log_from_file(file_path: str) -> dict:
     Returns:
         Normalized log as a Python dict matching the output contract.
     """
-    logger.info(f"Reading log file: {file_path}")
+    return normalize_log(_read_log_file(file_path))
 
-    with open(file_path, "r") as f:
-        raw_log = json.load(f)
 
-    return normalize_log(raw_log)
\ No newline at end of file
+async def anormalize_log_from_file(file_path: str) -> dict:
+    """
+    Async variant of normalize_log_from_file.
+
+    Args:
+        file_path: Path to the raw log JSON file.
+
+    Returns:
+        Normalized log as a Python dict matching the output contract.
+    """
+    return await anormalize_log(_read_log_file(file_path))
@@ -0,0 +1,188 @@
+"""
+normalizer_batch.py
+-------------------
+Offline (Gemini Batch Mode) normalization for OIC-LogLens.
+Submits many raw OIC logs as a single batch job — roughly half the cost of
+synchronous calls and not bound by per-minute quota — then reads the
+normalized results back from the job's output file.
+
+Usage:
+    job = normalize_log_batch_offline(raw_logs)
+    if job is not None:
+        job = await_job(job)
+    for i, normalized in iter_results(job, raw_logs):
+        ...   # normalized is the result for raw_logs[i]
+
+Each request is keyed by the raw log's template fingerprint, so identical
+templates are submitted once and already-cached templates are skipped.
+iter_results stores every result in the template cache, so a later batch
+(or a synchronous call) never re-submits a template seen here, and maps
+each template back to every input log with that log's own volatile values.
+"""
+
+import os
+import time
+import orjson
+import tempfile
+from google.genai import types
+
+from prompts import get_normalization_prompt
+from normalizer import _fingerprint, _apply_volatile, _parse_response, _template_cache
+from config import client, logger, GENERATION_MODEL
+
+# ── JOB CONFIG ─────────────────────────────────────────────────────────────────
+
+BATCH_DISPLAY_NAME   = "oic-normalize"
+BATCH_POLL_SECONDS   = 30
+
+BATCH_DONE_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+
+
+# ── SUBMIT ─────────────────────────────────────────────────────────────────────
+
+def normalize_log_batch_offline(raw_logs: list[list | str | bytes]) -> types.BatchJob | None:
+    """
+    Builds a JSONL request file from raw logs, uploads it, and submits a
+    Gemini Batch Mode job.
+
+    Args:
+        raw_logs: List of raw OIC logs (JSON arrays or JSON text as str/bytes).
+
+    Returns:
+        The submitted BatchJob handle, or None if every log was already
+        in the template cache.
+    """
+    seen  = set()
+    lines = []
+
+    for raw_log in raw_logs:
+        key, ref_log = _fingerprint(raw_log)
+        if key in seen or _template_cache.get(key, ref_log) is not None:
+            continue
+        seen.add(key)
+
+        if isinstance(raw_log, list):
+            raw_log_str = orjson.dumps(raw_log).decode()   # compact — no indent tokens
+        elif isinstance(raw_log, bytes):
+            raw_log_str = raw_log.decode()
+        else:
+            raw_log_str = raw_log
+        lines.append(orjson.dumps({
+            "key": key,
+            "request": {
+                "contents": [{"role": "user", "parts": [{"text": get_normalization_prompt(raw_log_str)}]}]
+            }
+        }).decode())
+
+    if not lines:
+        logger.info("Batch normalize: all logs served from template cache — no job submitted.")
+        return None
+
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+        f.write("\n".join(lines))
+        jsonl_path = f.name
+
+    try:
+        logger.info("Batch normalize: uploading %s request(s) ...", len(lines))
+        uploaded = client.files.upload(
+            file=jsonl_path,
+            config=types.UploadFileConfig(display_name=BATCH_DISPLAY_NAME, mime_type="jsonl")
+        )
+    finally:
+        os.remove(jsonl_path)
+
+    job = client.batches.create(
+        model=GENERATION_MODEL,
+        src=uploaded.name,
+        config={"display_name": BATCH_DISPLAY_NAME}
+    )
+    logger.info("Batch normalize: job submitted | %s", job.name)
+    return job
+
+
+# ── POLL ───────────────────────────────────────────────────────────────────────
+
+def await_job(job: types.BatchJob, poll_seconds: int = BATCH_POLL_SECONDS) -> types.BatchJob:
+    """
+    Polls a batch job until it reaches a terminal state.
+
+    Args:
+        job:          BatchJob returned by normalize_log_batch_offline.
+        poll_seconds: Seconds between status polls.
+
+    Returns:
+        The refreshed BatchJob in its terminal state.
+
+    Raises:
+        RuntimeError: If the job did not succeed.
+    """
+    while job.state.name not in BATCH_DONE_STATES:
+        logger.info("Batch normalize: %s is %s — polling in %ss ...", job.name, job.state.name, poll_seconds)
+        time.sleep(poll_seconds)
+        job = client.batches.get(name=job.name)
+
+    if job.state.name != "JOB_STATE_SUCCEEDED":
+        raise RuntimeError(f"Batch job {job.name} finished with state {job.state.name}: {job.error}")
+
+    logger.info("Batch normalize: %s succeeded.", job.name)
+    return job
+
+
+# ── RESULTS ────────────────────────────────────────────────────────────────────
+
+def iter_results(job: types.BatchJob | None, raw_logs: list[list | str | bytes]):
+    """
+    Downloads a succeeded batch job's output file, stores each normalized
+    template in the template cache and yields one result per input log.
+
+    Args:
+        job:      Succeeded BatchJob (output of await_job), or None when
+                  normalize_log_batch_offline found every log in the cache.
+        raw_logs: The raw logs passed to normalize_log_batch_offline.
+
+    Yields:
+        Tuple of (index into raw_logs, normalized dict) — the template with
+        that log's own timestamp, user and tracking values. Logs whose
+        request failed or returned invalid JSON are logged and skipped.
+    """
+    fingerprints = [_fingerprint(raw_log) for raw_log in raw_logs]
+    ref_logs     = dict(fingerprints)
+    templates    = {}
+
+    content = client.files.download(file=job.dest.file_name) if job is not None else b""
+
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+
+        record = orjson.loads(line)
+        key    = record.get("key")
+
+        if "error" in record:
+            logger.error("Batch normalize: request %s failed: %s", key, record["error"])
+            continue
+
+        try:
+            text       = record["response"]["candidates"][0]["content"]["parts"][0]["text"]
+            normalized = _parse_response(text)
+        except (KeyError, IndexError, ValueError) as e:
+            logger.error("Batch normalize: could not parse result for %s: %s", key, e)
+            continue
+
+        if key in ref_logs:
+            _template_cache.put(key, ref_logs[key], normalized)
+            templates[key] = normalized
+
+    for i, (raw_log, (key, ref_log)) in enumerate(zip(raw_logs, fingerprints)):
+        # templates cached before submission were never sent — serve them from the cache
+        if key not in templates:
+            templates[key] = _template_cache.get(key, ref_log)
+
+        normalized = templates[key]
+        if normalized is not None:
+            yield i, _apply_volatile(normalized, raw_log)
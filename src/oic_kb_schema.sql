@@ -3,7 +3,7 @@
 -- File     : oll_schema.sql
 -- Table    : OIC_KB_ISSUE  (renamed from OLL_LOGS)
 -- User     : EA_APP | DB: FREEPDB1
--- Version  : 1.1
+-- Version  : 1.4
 -- ============================================================
 -- NAMING CONVENTION (consistent across entire project):
 --   OIC_KB_             → prefix for all OIC Knowledge Base objects
@@ -39,7 +39,7 @@ END;
 
 CREATE TABLE OIC_KB_ISSUE (
     LOG_ID            VARCHAR2(100)    PRIMARY KEY,
-    LOG_HASH          VARCHAR2(64)     NOT NULL,
+    LOG_HASH          RAW(32)          NOT NULL,
     JIRA_ID           VARCHAR2(100),
     LOG_TYPE          VARCHAR2(20),
     EVENT_TIME        TIMESTAMP,
@@ -49,9 +49,9 @@ CREATE TABLE OIC_KB_ISSUE (
     ERROR_CODE        VARCHAR2(100),
     ERROR_SUMMARY     CLOB,
     SEMANTIC_TEXT     CLOB,
-    RAW_JSON          CLOB,
-    NORMALIZED_JSON   CLOB,
-    VECTOR            VECTOR(3072, FLOAT32)
+    RAW_JSON          BLOB,
+    NORMALIZED_JSON   BLOB,
+    VECTOR            VECTOR(3072, INT8)
 );
 
 ALTER TABLE OIC_KB_ISSUE ADD CONSTRAINT OIC_KB_ISSUE_HASH_UQ UNIQUE (LOG_HASH);
@@ -66,7 +66,7 @@ COMMENT ON COLUMN OIC_KB_ISSUE.LOG_ID IS
     'Primary key. UUID generated at insert time. Uniquely identifies each ingested log record.';
 
 COMMENT ON COLUMN OIC_KB_ISSUE.LOG_HASH IS
-    'SHA256 hash of the raw log JSON. Used to prevent duplicate log ingestion. Same raw log will always produce the same hash.';
+    'SHA256 digest (32 raw bytes) of the raw log JSON. Used to prevent duplicate log ingestion. Same raw log will always produce the same hash.';
 
 COMMENT ON COLUMN OIC_KB_ISSUE.JIRA_ID IS
     'Associated Jira issue ID for this log. Used as the deduplication reference returned during similarity search.';
@@ -96,13 +96,13 @@ COMMENT ON COLUMN OIC_KB_ISSUE.SEMANTIC_TEXT IS
     'Concatenated text string built from key normalized fields. This is the input used to generate the vector embedding.';
 
 COMMENT ON COLUMN OIC_KB_ISSUE.RAW_JSON IS
-    'Original raw OIC log file content as-is. Stored for traceability and reprocessing.';
+    'Original raw OIC log file content (sorted-key JSON), zlib-compressed. Stored for traceability and reprocessing.';
 
 COMMENT ON COLUMN OIC_KB_ISSUE.NORMALIZED_JSON IS
-    'Full normalized log JSON produced by the LLM normalization pipeline. Stored for audit and future use.';
+    'Full normalized log JSON produced by the LLM normalization pipeline, zlib-compressed. Stored for audit and future use.';
 
 COMMENT ON COLUMN OIC_KB_ISSUE.VECTOR IS
-    'Vector embedding (3072 dimensions, FLOAT32) generated from SEMANTIC_TEXT using Gemini gemini-embedding-001. Used for cosine similarity search.';
+    'Vector embedding (3072 dimensions, INT8) generated from SEMANTIC_TEXT using Gemini gemini-embedding-001, L2-normalized and quantized. Used for cosine similarity search.';
 
 
 -- ── Vector Index (HNSW Cosine) ───────────────────────────────
@@ -91,30 +91,49 @@ RULES:
 
 # ── PROMPT FUNCTIONS ───────────────────────────────────────────────────────────
 
-def get_normalization_prompt(raw_log: str) -> str:
+NORMALIZATION_PREFIX = f"""You are a log normalization engine for Oracle Integration Cloud (OIC) logs.
+
+Your job is to read a raw OIC log and extract a normalized JSON object that strictly follows the output schema below.
+
+OUTPUT SCHEMA:
+{NORMALIZED_LOG_SCHEMA}
+
+{NORMALIZATION_RULES}
+"""
+
+
+# Constant pieces around the raw log — concatenated once at import time.
+_LOG_PART_HEAD = "RAW LOG:\n"
+_PROMPT_TAIL   = "\n\nReturn only the normalized JSON object. No explanation. No markdown. No code fences.\n"
+_PROMPT_HEAD   = NORMALIZATION_PREFIX + "\n" + _LOG_PART_HEAD
+
+
+def get_normalization_log_part(raw_log: str) -> str:
     """
-    Builds the normalization prompt for a raw OIC log.
+    Builds the per-log part of the normalization prompt — everything after
+    the static NORMALIZATION_PREFIX. Used on its own when the prefix is
+    served from a Gemini context cache.
 
     Args:
         raw_log: The raw log file content as a JSON string.
 
     Returns:
-        The complete prompt string to send to the LLM.
+        The raw-log portion of the prompt.
     """
-    return f"""You are a log normalization engine for Oracle Integration Cloud (OIC) logs.
-
-Your job is to read a raw OIC log and extract a normalized JSON object that strictly follows the output schema below.
+    return _LOG_PART_HEAD + raw_log + _PROMPT_TAIL
 
-OUTPUT SCHEMA:
-{NORMALIZED_LOG_SCHEMA}
 
-{NORMALIZATION_RULES}
+def get_normalization_prompt(raw_log: str) -> str:
+    """
+    Builds the normalization prompt for a raw OIC log.
 
-RAW LOG:
-{raw_log}
+    Args:
+        raw_log: The raw log file content as a JSON string.
 
-Return only the normalized JSON object. No explanation. No markdown. No code fences.
-"""
+    Returns:
+        The complete prompt string to send to the LLM.
+    """
+    return _PROMPT_HEAD + raw_log + _PROMPT_TAIL
 
 # ── EMBEDDING FIELDS ──────────────────────────────────────────────────────────
 # Fields selected from the normalized log to build the embedding text.
@@ -136,6 +155,26 @@ EMBEDDING_NESTED_FIELDS = [
 ]
 
 
+def _make_accessor(path: tuple):
+    """
+    Builds a getter that walks a fixed key path through nested dicts.
+    Returns None as soon as a non-dict is reached.
+    """
+    def get(d):
+        for key in path:
+            if not isinstance(d, dict):
+                return None
+            d = d.get(key)
+        return d
+    return get
+
+
+# Built once at import — update the field globals above, not this list.
+_EMBEDDING_ACCESSORS = [
+    _make_accessor(path) for path in EMBEDDING_FIELDS + EMBEDDING_NESTED_FIELDS
+]
+
+
 def get_embedding_text(normalized_log: dict) -> str:
     """
     Builds a single concatenated text string from selected fields
@@ -147,27 +186,25 @@ def get_embedding_text(normalized_log: dict) -> str:
     Returns:
         A clean concatenated string of the selected fields.
     """
-    parts = []
-
-    for parent, field in EMBEDDING_FIELDS:
-        value = normalized_log.get(parent, {})
-        if isinstance(value, dict):
-            val = value.get(field)
-        else:
-            val = None
-        if val:
-            parts.append(str(val))
-
-    for parent, child, field in EMBEDDING_NESTED_FIELDS:
-        val = normalized_log.get(parent, {})
-        if isinstance(val, dict):
-            val = val.get(child, {})
-        if isinstance(val, dict):
-            val = val.get(field)
-        if val:
-            parts.append(str(val))
-
-    return " ".join(parts)
+    values = (get(normalized_log) for get in _EMBEDDING_ACCESSORS)
+    return " ".join(str(v) for v in values if v)
+
+
+def get_embedding_texts_batch(normalized_logs: list[dict]) -> list[str]:
+    """
+    Builds embedding texts for many normalized logs at once.
+    Extracts one column per embedding field across the whole batch, then
+    joins the columns row-wise — same output as calling get_embedding_text
+    on each log.
+
+    Args:
+        normalized_logs: List of normalized log dicts (output of normalize_log).
+
+    Returns:
+        List of embedding text strings, one per input log (same order).
+    """
+    columns = [list(map(get, normalized_logs)) for get in _EMBEDDING_ACCESSORS]
+    return [" ".join(str(v) for v in row if v) for row in zip(*columns)]
 
 
 # ── RE-RANKING PROMPT ──────────────────────────────────────────────────────────
@@ -5,6 +5,10 @@ Search and deduplication service for OIC-LogLens.
 Provides semantic similarity search for duplicate detection.
 """
 
+import copy
+import time
+import threading
+import numpy as np
 from typing import List, Dict, Any
 from fastapi import HTTPException, status
 
@@ -16,6 +20,89 @@ from graph_service import enrich_search_results, add_jira_relationship
 from config import logger
 
 
+# ── SEMANTIC QUERY CACHE ───────────────────────────────────────────────────────
+
+QUERY_CACHE_SIZE        = 1024
+QUERY_CACHE_THRESHOLD   = 0.97   # min cosine similarity to reuse a cached query's results
+QUERY_CACHE_TTL_SECONDS = 300    # newly ingested logs show up in results after at most this
+
+
+class _QueryCache:
+    """
+    Results of recent searches keyed by their query embedding. A query whose
+    embedding is within QUERY_CACHE_THRESHOLD cosine similarity of a cached
+    one reuses its results, skipping the vector search, re-ranking and graph
+    enrichment. Unit-length embeddings are kept in a fixed-size ring buffer,
+    so a lookup is a single matrix-vector product.
+    """
+
+    def __init__(self, size: int):
+        self._lock    = threading.Lock()
+        self._size    = size
+        self._vectors = None             # (size, dim) float32, allocated on first put
+        self._entries = [None] * size    # (expires_at, top_n, results) per row
+        self._next    = 0
+        self._hits    = 0
+        self._misses  = 0
+
+    @staticmethod
+    def _unit(embedding: np.ndarray) -> np.ndarray:
+        vec  = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+    def get(self, embedding: np.ndarray, top_n: int) -> List[Dict[str, Any]] | None:
+        vec = self._unit(embedding)
+        with self._lock:
+            if self._vectors is not None:
+                scores = self._vectors @ vec
+                best   = int(np.argmax(scores))
+                entry  = self._entries[best]
+                if (entry is not None and scores[best] >= QUERY_CACHE_THRESHOLD
+                        and entry[0] > time.monotonic() and entry[1] >= top_n):
+                    self._hits += 1
+                    return copy.deepcopy(entry[2][:top_n])
+            self._misses += 1
+            return None
+
+    def put(self, embedding: np.ndarray, top_n: int, results: List[Dict[str, Any]]) -> None:
+        vec = self._unit(embedding)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self._size, vec.shape[0]), dtype=np.float32)
+            row = self._next
+            self._vectors[row] = vec
+            self._entries[row] = (time.monotonic() + QUERY_CACHE_TTL_SECONDS, top_n, copy.deepcopy(results))
+            self._next = (row + 1) % self._size
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": sum(entry is not None for entry in self._entries),
+                "hits":    self._hits,
+                "misses":  self._misses
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._vectors = None
+            self._entries = [None] * self._size
+            self._next    = 0
+
+
+_query_cache = _QueryCache(QUERY_CACHE_SIZE)
+
+
+def get_query_cache_stats() -> dict:
+    """Returns entry count and hit/miss counters for the semantic query cache."""
+    return _query_cache.stats()
+
+
+def clear_query_cache() -> None:
+    """Removes every cached search result."""
+    _query_cache.clear()
+
+
 # ── LLM RE-RANKING ─────────────────────────────────────────────────────────────
 
 def rerank_with_llm(normalized_log: Dict[str, Any], candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -130,7 +217,7 @@ def search_log(raw_log: List[Dict[str, Any]], top_n: int = 5) -> List[Dict[str,
 
     Pipeline:
     1. Normalize log using Gemini LLM
-    2. Generate embedding vector
+    2. Generate embedding vector (a near-identical recent query returns its cached results)
     3. Vector similarity search in Oracle 26ai (OIC_KB_ISSUE)
     4. Format results
     5. LLM re-ranking + classification
@@ -157,6 +244,11 @@ def search_log(raw_log: List[Dict[str, Any]], top_n: int = 5) -> List[Dict[str,
         logger.info("Generating query embedding...")
         embedding = generate_embedding(normalized_log)
 
+        cached = _query_cache.get(embedding, top_n)
+        if cached is not None:
+            logger.info(f"Semantic query cache hit — returning {len(cached)} cached matches.")
+            return cached
+
         # ── Step 3: Vector similarity search ───────────────────────────────────
         logger.info(f"Searching for Top-{top_n} similar logs...")
         results = search_similar_logs(embedding, top_n)
@@ -196,9 +288,14 @@ def search_log(raw_log: List[Dict[str, Any]], top_n: int = 5) -> List[Dict[str,
         logger.info("Enriching results with Knowledge Graph insights...")
         final_results = enrich_search_results(final_results)
 
+        _query_cache.put(embedding, top_n, final_results)
+
         logger.info(f"Search complete. {len(final_results)} matches returned.")
         return final_results
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         logger.error(f"Search pipeline failed: {e}")
         raise HTTPException(
@@ -1,7 +1,10 @@
-import json
 import sys
-from normalizer import normalize_log_from_file
-from embedder import generate_embedding
+import orjson
+import numpy as np
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from normalizer import anormalize_log
+from embedder import agenerate_embedding
 from prompts import get_embedding_text
 from db import insert_log
 
@@ -28,13 +31,25 @@ JIRA_IDS = [
     "OIC-1008",
 ]
 
+# Concurrency for the async Gemini fan-out.
+# anormalize_log / agenerate_embedding rate-limit their own Gemini requests
+# (gemini_rate.call_gemini), so cache hits here are not throttled.
+MAX_CONCURRENCY  = 8
+IO_WORKERS       = 8
 
-def test_normalization(file_path: str) -> tuple[dict, list] | tuple[None, None]:
+
+def _read_bytes(file_path: str) -> bytes:
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+async def test_normalization(file_path: str, raw_bytes: bytes) -> tuple[dict, list] | tuple[None, None]:
     """
-    Normalizes a single log file and prints the result.
+    Normalizes a single (already read) log file and prints the result.
 
     Args:
-        file_path: Path to the log file.
+        file_path: Path to the log file — used for display only.
+        raw_bytes: Raw file content.
 
     Returns:
         Tuple of (normalized_log dict, raw_log list) if successful.
@@ -44,17 +59,16 @@ def test_normalization(file_path: str) -> tuple[dict, list] | tuple[None, None]:
     print(f"FILE : {file_path}")
     print(f"{'='*60}")
     try:
-        with open(file_path) as f:
-            raw_log = json.load(f)
-        normalized = normalize_log_from_file(file_path)
-        print(json.dumps(normalized, sort_keys=True, indent=4))
+        raw_log = orjson.loads(raw_bytes)
+        normalized = await anormalize_log(raw_bytes)
+        print(orjson.dumps(normalized, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS).decode())
         return normalized, raw_log
     except Exception as e:
         print(f"[NORMALIZATION ERROR] {e}")
         return None, None
 
 
-def test_embedding(normalized_log: dict, file_path: str) -> tuple[list, str] | tuple[None, None]:
+async def test_embedding(normalized_log: dict, file_path: str) -> tuple[np.ndarray, str] | tuple[None, None]:
     """
     Generates an embedding for a normalized log and prints a summary.
 
@@ -63,13 +77,13 @@ def test_embedding(normalized_log: dict, file_path: str) -> tuple[list, str] | t
         file_path:      Source file path — used for display only.
 
     Returns:
-        Tuple of (embedding list, semantic_text str) if successful.
+        Tuple of (embedding array, semantic_text str) if successful.
         Tuple of (None, None) if an error occurred.
     """
     print(f"\n--- Embedding: {file_path} ---")
     try:
         semantic_text = get_embedding_text(normalized_log)
-        embedding = generate_embedding(normalized_log)
+        embedding = await agenerate_embedding(normalized_log)
         print(f"Dimensions : {len(embedding)}")
         print(f"Sample     : {embedding[:5]}")
         return embedding, semantic_text
@@ -81,7 +95,7 @@ def test_embedding(normalized_log: dict, file_path: str) -> tuple[list, str] | t
 def test_db_insert(
     normalized_log: dict,
     raw_log: list,
-    embedding: list,
+    embedding: np.ndarray,
     semantic_text: str,
     jira_id: str,
     file_path: str
@@ -116,9 +130,12 @@ def test_db_insert(
         return False
 
 
-def test_all_files(log_files: list[str], jira_ids: list[str]) -> tuple[int, int]:
+async def test_all_files(log_files: list[str], jira_ids: list[str]) -> tuple[int, int]:
     """
     Runs normalization, embedding, and DB insert tests on all log files.
+    All files are read up front on a thread pool so file I/O overlaps with
+    the Gemini calls, which are fanned out concurrently (bounded by
+    MAX_CONCURRENCY and the shared GEMINI_RATE); DB inserts then run in file order.
 
     Args:
         log_files: List of log file paths to test.
@@ -130,21 +147,38 @@ def test_all_files(log_files: list[str], jira_ids: list[str]) -> tuple[int, int]
     passed = 0
     failed = 0
 
-    for file_path, jira_id in zip(log_files, jira_ids):
-
-        # Step 1 — Normalize
-        normalized, raw_log = test_normalization(file_path)
-        if normalized is None:
-            failed += 1
-            continue
+    sem  = asyncio.Semaphore(MAX_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+
+    async def one(file_path: str, read):
+        raw_bytes = await read
+        async with sem:
+            # Step 1 — Normalize
+            normalized, raw_log = await test_normalization(file_path, raw_bytes)
+            if normalized is None:
+                return None
+
+            # Step 2 — Embed
+            embedding, semantic_text = await test_embedding(normalized, file_path)
+            if embedding is None:
+                return None
+
+            return normalized, raw_log, embedding, semantic_text
+
+    with ThreadPoolExecutor(max_workers=IO_WORKERS) as io_pool:
+        reads   = [loop.run_in_executor(io_pool, _read_bytes, f) for f in log_files]
+        results = await asyncio.gather(
+            *(one(f, read) for f, read in zip(log_files, reads)),
+            return_exceptions=True
+        )
 
-        # Step 2 — Embed
-        embedding, semantic_text = test_embedding(normalized, file_path)
-        if embedding is None:
+    for file_path, jira_id, result in zip(log_files, jira_ids, results):
+        if result is None or isinstance(result, BaseException):
             failed += 1
             continue
 
         # Step 3 — Insert
+        normalized, raw_log, embedding, semantic_text = result
         ok = test_db_insert(normalized, raw_log, embedding, semantic_text, jira_id, file_path)
         if ok:
             passed += 1
@@ -169,6 +203,6 @@ def print_summary(passed: int, failed: int, total: int) -> None:
 
 
 if __name__ == "__main__":
-    passed, failed = test_all_files(LOG_FILES, JIRA_IDS)
+    passed, failed = asyncio.run(test_all_files(LOG_FILES, JIRA_IDS))
     print_summary(passed, failed, len(LOG_FILES))
     sys.exit(0 if failed == 0 else 1)
\ No newline at end of file
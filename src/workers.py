@@ -0,0 +1,250 @@
+"""
+workers.py
+----------
+Background batch ingestion for OIC-LogLens.
+
+process_batch runs a /ingest/database job end to end. The API schedules it as
+a FastAPI background task, or — when OLL_REDIS_URL is set — enqueues it to an
+arq worker running in its own process:
+
+    arq workers.WorkerSettings
+
+Jobs carry only the source connection string and query; logs are streamed
+from the source database while the job runs. arq re-runs a job whose worker
+died, and an interrupted batch resumes from the results already in the job
+store instead of starting over.
+"""
+
+import asyncio
+import hashlib
+
+from arq.connections import RedisSettings
+from fastapi.concurrency import run_in_threadpool
+
+from ingestion_service import (load_from_raw_text, stream_from_database, aprepare_log, aembed_pending, ingest_logs_bulk,
+                               BATCH_CONCURRENCY, STORE_BATCH_SIZE, STORE_QUEUE_SIZE)
+from db import encode_raw_log
+from job_store import jobs
+from config import logger, REDIS_URL
+
+BATCH_JOB_TIMEOUT   = 6 * 3600   # seconds an arq worker may spend on one batch
+BATCH_JOB_MAX_TRIES = 3
+
+REDIS_SETTINGS = RedisSettings.from_dsn(REDIS_URL or "redis://localhost:6379")
+
+
+# ── BATCH PIPELINE ─────────────────────────────────────────────────────────────
+
+def _row_hash(log_content: str | bytes) -> str:
+    # Resume key for rows that are not valid logs and so have no LOG_HASH
+    return hashlib.sha256(log_content.encode() if isinstance(log_content, str) else log_content).hexdigest()
+
+
+async def _record_result(job_id: str, i: int, log_hash: str, log_id: str = "", jira_id: str = "",
+                         error: Exception = None):
+    """
+    Appends log i's outcome to the job's results and bumps its counters —
+    success when log_id is set, duplicate for a 409, error otherwise.
+    log_hash identifies the row when an interrupted job is resumed.
+    """
+    from fastapi import HTTPException
+
+    if log_id:
+        counter, status_, message = "successful", "success", f"Log {i} ingested successfully"
+    elif isinstance(error, HTTPException) and error.status_code == 409:
+        counter, status_, message = "duplicates", "duplicate", f"Log {i}: Duplicate detected"
+    else:
+        detail = error.detail if isinstance(error, HTTPException) else str(error)
+        counter, status_, message = "failed", "error", f"Log {i}: {detail}"
+
+    await jobs.add_result(job_id, counter, {
+        "log_index": i,
+        "log_hash":  log_hash,
+        "log_id":    log_id,
+        "jira_id":   jira_id if log_id else "",
+        "status":    status_,
+        "message":   message
+    })
+
+
+async def process_batch(job_id: str, connection_string: str, query: str):
+    """
+    Background task — a two-stage pipeline. Logs are streamed from the
+    source query (stream_from_database) and normalized
+    concurrently, bounded by BATCH_CONCURRENCY and the shared Gemini rate
+    limiter; each one is queued to a store stage that takes whatever has
+    accumulated (up to STORE_BATCH_SIZE), embeds it with one batched Gemini
+    call and bulk INSERTs it while the remaining logs are still normalizing.
+    At most BATCH_CONCURRENCY + STORE_QUEUE_SIZE logs are held in memory;
+    total_logs is set once the source query has been read to the end.
+    Progress is written to the job store so the status endpoint can poll it.
+
+    Runs as a FastAPI background task, or on an arq worker (see
+    process_batch_task) when a Redis job store is configured.
+    """
+    from fastapi import HTTPException
+
+    job = await jobs.get(job_id)
+
+    # A re-run of an interrupted job skips every row that already has a result,
+    # matched by LOG_HASH — independent of the order the query returns rows in
+    recorded = {r["log_hash"] for r in job["results"]}
+    if recorded:
+        logger.info(f"Job {job_id} | Resuming | {len(recorded)} logs already processed")
+    await jobs.update(job_id, status="in_progress", processed=len(recorded))
+
+    sem      = asyncio.Semaphore(BATCH_CONCURRENCY)   # acquired by produce, released by prepare
+    queue    = asyncio.Queue(maxsize=STORE_QUEUE_SIZE)   # (log_index, log_hash, prepare_log output) | None
+    stopping = asyncio.Event()                        # set when a stage fails outside a single log
+    failures = []
+
+    async def prepare(i: int, log_content: str | bytes):
+        try:
+            if stopping.is_set():
+                return
+
+            try:
+                raw_log  = load_from_raw_text(log_content)
+                log_hash = encode_raw_log(raw_log)[1]
+                invalid  = None
+            except Exception as e:
+                log_hash, invalid = _row_hash(log_content), e
+
+            if log_hash in recorded:
+                return
+
+            await jobs.update(job_id, current_log=i)
+            logger.info(f"Job {job_id} | Processing log {i}")
+            try:
+                if invalid is not None:
+                    raise invalid
+                prepared = await aprepare_log(raw_log, embed=False)   # embedded per store batch
+            except Exception as e:
+                await _record_result(job_id, i, log_hash, error=e)
+                return
+            finally:
+                await jobs.incr(job_id, "processed")
+
+            await queue.put((i, log_hash, prepared))
+        except Exception as e:   # job store errors — stop the job rather than lose progress
+            failures.append(e)
+            stopping.set()
+        finally:
+            sem.release()
+
+    async def store():
+        done = False
+        try:
+            while not done:
+                batch = []
+                item  = await queue.get()
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) == STORE_BATCH_SIZE or queue.empty():
+                        break
+                    item = queue.get_nowait()
+                done = item is None
+
+                if not batch:
+                    continue
+
+                logger.info(f"Job {job_id} | Bulk storing {len(batch)} log(s)")
+                try:
+                    prepared_logs = [prepared for _, _, prepared in batch]
+                    await aembed_pending(prepared_logs)
+                    stored = await run_in_threadpool(ingest_logs_bulk, prepared_logs)
+                except Exception as e:
+                    stored = [(None, e)] * len(batch)
+
+                for (i, log_hash, prepared), (log_id, error) in zip(batch, stored):
+                    await _record_result(job_id, i, log_hash, log_id or "", prepared["jira_id"], error)
+
+        except Exception:
+            # e.g. the job store is unreachable — stop the producers and keep
+            # draining so none of them stays blocked on the full queue
+            stopping.set()
+            while not done:
+                done = await queue.get() is None
+            raise
+
+    async def produce():
+        rows    = stream_from_database(connection_string, query)
+        pending = set()
+        i       = 0
+        try:
+            while not stopping.is_set() and (chunk := await run_in_threadpool(next, rows, None)):
+                for log_content in chunk:
+                    i += 1
+                    if stopping.is_set():
+                        break
+                    await sem.acquire()
+                    task = asyncio.create_task(prepare(i, log_content))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+
+            if not stopping.is_set():
+                # the stream is exhausted — the job's size is known only now
+                await jobs.update(job_id, total_logs=i)
+                if not i:
+                    raise HTTPException(status_code=404, detail="Query returned no results")
+        finally:
+            await run_in_threadpool(rows.close)
+            await asyncio.gather(*pending)
+            await queue.put(None)
+
+        if failures:
+            raise failures[0]
+
+    # Wait for both stages even when one fails, so the store stage is done
+    # writing results before the job's terminal status is set
+    outcomes = await asyncio.gather(produce(), store(), return_exceptions=True)
+    failed   = [e for e in outcomes if isinstance(e, BaseException)]
+    if failed:
+        e     = failed[0]
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        await jobs.update(job_id, status="failed", current_log=None, error=error)
+        logger.error(f"Job {job_id} | Failed | {error}")
+        return
+
+    job = await jobs.get(job_id)
+
+    # Mark job complete
+    if job["failed"] == 0 and job["duplicates"] == 0:
+        job["status"] = "completed"
+    elif job["successful"] > 0:
+        job["status"] = "completed"
+    else:
+        job["status"] = "failed"
+
+    await jobs.update(job_id, status=job["status"], current_log=None)
+    logger.info(f"Job {job_id} | Done | success={job['successful']} duplicates={job['duplicates']} failed={job['failed']}")
+
+
+# ── ARQ WORKER ─────────────────────────────────────────────────────────────────
+
+async def process_batch_task(ctx: dict, job_id: str, connection_string: str, query: str):
+    """arq entry point for process_batch."""
+    await process_batch(job_id, connection_string, query)
+
+
+async def _worker_startup(ctx: dict):
+    from db import load_hash_filter
+    await run_in_threadpool(load_hash_filter)
+
+
+async def _worker_shutdown(ctx: dict):
+    from db import close_connection_pool
+    from ingestion_service import close_source_pools
+    close_connection_pool()
+    close_source_pools()
+    await jobs.close()
+
+
+class WorkerSettings:
+    """Settings for `arq workers.WorkerSettings`."""
+    functions      = [process_batch_task]
+    on_startup     = _worker_startup
+    on_shutdown    = _worker_shutdown
+    redis_settings = REDIS_SETTINGS
+    job_timeout    = BATCH_JOB_TIMEOUT
+    max_tries      = BATCH_JOB_MAX_TRIES
@@ -10,7 +10,14 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-agent = Agent()
+
+@st.cache_resource
+def get_agent() -> Agent:
+    # Built once per process and reused across reruns/sessions
+    return Agent()
+
+
+agent = get_agent()
 
 # ----------------------------
 # Global CSS
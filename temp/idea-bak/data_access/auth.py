@@ -1,5 +1,5 @@
 import os
-from requests.auth import HTTPBasicAuth
+import httpx
 
 
 def get_auth():
@@ -9,4 +9,4 @@ def get_auth():
     if not username or not password:
         raise RuntimeError("Oracle credentials not set")
 
-    return HTTPBasicAuth(username, password)
+    return httpx.BasicAuth(username, password)
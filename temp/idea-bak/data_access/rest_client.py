@@ -1,7 +1,13 @@
 import os
-import requests
+import httpx
 from data_access.auth import get_auth
 
+# One pooled async client per process, shared by every RestClient
+_http = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    timeout=30.0
+)
+
 
 class RestClient:
     def __init__(self):
@@ -10,15 +16,15 @@ class RestClient:
         self.auth = get_auth()
         self.headers = {"Accept": "application/json"}
 
-    def get(self, endpoint, params):
+    async def get(self, endpoint, params):
         if self.mode == "MOCK":
             return self._mock_response()
 
-        return self._real_get(endpoint, params)
+        return await self._real_get(endpoint, params)
 
-    def _real_get(self, endpoint, params):
+    async def _real_get(self, endpoint, params):
         url = f"{self.base_url}{endpoint}"
-        response = requests.get(
+        response = await _http.get(
             url,
             headers=self.headers,
             params=params,
@@ -6,9 +6,9 @@ service = InvoiceService()
 
 
 @router.get("/invoice/{invoice_id}")
-def get_invoice_by_id(invoice_id: str):
+async def get_invoice_by_id(invoice_id: str):
     try:
-        invoice = service.get_invoice_by_id(invoice_id)
+        invoice = await service.get_invoice_by_id(invoice_id)
 
         if not invoice:
             raise HTTPException(
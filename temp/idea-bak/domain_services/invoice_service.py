@@ -5,14 +5,14 @@ class InvoiceService:
     def __init__(self):
         self.client = RestClient()
 
-    def get_invoice_by_id(self, invoice_id: int):
+    async def get_invoice_by_id(self, invoice_id: int):
         endpoint = "/fscmRestApi/resources/11.13.18.05/invoices"
         params = {
             "q": f"InvoiceId={invoice_id}",
             "onlyData": "true"
         }
 
-        response = self.client.get(endpoint, params)
+        response = await self.client.get(endpoint, params)
 
         items = response.get("items", [])
         if not items: